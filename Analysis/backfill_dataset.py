@@ -0,0 +1,182 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import extract_info
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ITERATION_RE = re.compile(r'^iteration_(\d+)$')
+
+# Files whose content the features are derived from; a folder is recomputed
+# only when one of them (or the feature code) changed since the last backfill.
+INPUT_FILES = ['params.json', 'summary_steps.csv', 'tripinfo_summary.csv', 'edge_density.csv']
+
+# Flows run for 600 s in ramp.rou.xml, so every vehicle stands for 6 veh/h
+FLOW_SECONDS = 600.0
+
+DATASET_FIELDS = ['sim_id', 'highway_speed', 'ramp_speed', 'vehsPerHour_main', 'vehsPerHour_ramp',
+                  'vehsPerHour_total', 'meanSpeed_avg']
+
+
+def code_version():
+    """Hash of this module and extract_info.py, so editing the feature code invalidates every cached row."""
+    digest = hashlib.sha1()
+    for module in (os.path.abspath(__file__), os.path.abspath(extract_info.__file__)):
+        with open(module, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+def fingerprint(folder):
+    """Size and mtime of the input files of an iteration folder."""
+    stamp = {}
+    for name in INPUT_FILES:
+        path = os.path.join(folder, name)
+        if os.path.exists(path):
+            st = os.stat(path)
+            stamp[name] = [st.st_size, st.st_mtime_ns]
+    return stamp
+
+
+def params_from_folder(folder, legacy_speeds, flow_step):
+    """
+    Recover the parameters an iteration folder was simulated with.
+
+    Folders written by the sweep hold a params.json. Older folders only have
+    CSVs: the flows are recovered from the number of mainFlow/rampFlow trips
+    (rounded to flow_step veh/h) and the speeds fall back to legacy_speeds.
+    """
+    params_path = os.path.join(folder, 'params.json')
+    if os.path.exists(params_path):
+        with open(params_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    tripinfo = os.path.join(folder, 'tripinfo_summary.csv')
+    if not os.path.exists(tripinfo):
+        return None
+    counts = {'main': 0, 'ramp': 0}
+    with open(tripinfo, 'r', newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            vid = row.get('id', '').lower()
+            if vid.startswith('main'):
+                counts['main'] += 1
+            elif vid.startswith('ramp'):
+                counts['ramp'] += 1
+
+    def to_flow(n):
+        return round(n * 3600.0 / FLOW_SECONDS / flow_step) * flow_step
+
+    return {
+        'highway_speed': legacy_speeds[0],
+        'ramp_speed': legacy_speeds[1],
+        'mainline_flow': to_flow(counts['main']),
+        'rampline_flow': to_flow(counts['ramp']),
+    }
+
+
+def derive_row(folder, legacy_speeds, flow_step):
+    """Build the dataset row of one iteration folder (None if it cannot be mapped or has no target)."""
+    params = params_from_folder(folder, legacy_speeds, flow_step)
+    if params is None:
+        return None
+    features = extract_info.derive_features(folder)
+    if features.get('meanSpeed_avg') is None:
+        return None
+    main, ramp = float(params['mainline_flow']), float(params['rampline_flow'])
+    return {
+        'sim_id': os.path.basename(folder),
+        'highway_speed': float(params['highway_speed']),
+        'ramp_speed': float(params['ramp_speed']),
+        'vehsPerHour_main': main,
+        'vehsPerHour_ramp': ramp,
+        'vehsPerHour_total': main + ramp,
+        **features,
+    }
+
+
+def _derive(task):
+    folder, legacy_speeds, flow_step = task
+    return folder, derive_row(folder, legacy_speeds, flow_step)
+
+
+def iteration_folders(results_dir):
+    """Return the iteration_N folders of results_dir sorted by N."""
+    found = []
+    for name in os.listdir(results_dir):
+        match = ITERATION_RE.match(name)
+        if match and os.path.isdir(os.path.join(results_dir, name)):
+            found.append((int(match.group(1)), os.path.join(results_dir, name)))
+    return [path for _n, path in sorted(found)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild the dataset from existing iteration folders.')
+    parser.add_argument('--results', default='analysis_results', help='Folder holding iteration_N folders')
+    parser.add_argument('--out', default='../NN/sim_summary_min.csv', help='Dataset CSV to rebuild')
+    parser.add_argument('--manifest', default='analysis_results/backfill_manifest.json',
+                        help='Cache of fingerprints and rows from the previous backfill')
+    # The sweep rewrites ramp.edg.xml, so the speeds of the original runs are given explicitly
+    parser.add_argument('--legacy-speeds', default='30.0,20.0',
+                        help='"highway,ramp" speeds of folders without params.json')
+    parser.add_argument('--flow-step', type=float, default=50.0,
+                        help='Recovered flows of folders without params.json are rounded to this step')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes')
+    parser.add_argument('--force', action='store_true', help='Recompute every folder')
+    args = parser.parse_args()
+
+    results_dir, out_path, manifest_path = (
+        os.path.normpath(os.path.join(BASE_DIR, p)) for p in (args.results, args.out, args.manifest))
+    legacy_speeds = tuple(float(v) for v in args.legacy_speeds.split(','))
+
+    manifest = {}
+    if os.path.exists(manifest_path) and not args.force:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    version = code_version()
+
+    start = time.perf_counter()
+    folders = iteration_folders(results_dir)
+    stamps = {folder: fingerprint(folder) for folder in folders}
+    rows, todo = {}, []
+    for folder in folders:
+        name = os.path.basename(folder)
+        cached = manifest.get(name)
+        if cached and cached.get('version') == version and cached.get('inputs') == stamps[folder]:
+            rows[folder] = cached.get('row')
+        else:
+            todo.append((folder, legacy_speeds, args.flow_step))
+
+    print(f'🔎 {len(folders)} iteration folders, {len(todo)} to (re)derive, {len(folders) - len(todo)} unchanged')
+    if todo:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            for folder, row in pool.map(_derive, todo, chunksize=max(1, len(todo) // (4 * (args.workers or 1)))):
+                rows[folder] = row
+
+    dataset = [rows[folder] for folder in folders if rows.get(folder)]
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    with open(out_path, 'w', newline='', encoding='utf-8') as f:
+        # Features added to extract_info.derive_features become extra columns
+        extra = dict.fromkeys(k for row in dataset for k in row if k not in DATASET_FIELDS)
+        fields = DATASET_FIELDS + list(extra)
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for row in dataset:
+            writer.writerow({k: row.get(k, '') for k in fields})
+
+    manifest = {os.path.basename(folder): {'version': version, 'inputs': stamps[folder], 'row': rows.get(folder)}
+                for folder in folders}
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+
+    skipped = len(folders) - len(dataset)
+    print(f'✅ Wrote {len(dataset)} rows to {out_path} in {time.perf_counter() - start:.1f} s'
+          + (f' ({skipped} folders skipped: no parameters or no target)' if skipped else ''))
+
+
+if __name__ == '__main__':
+    main()
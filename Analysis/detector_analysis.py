@@ -0,0 +1,29 @@
+import os
+import xml.etree.ElementTree as ET
+import pandas as pd
+from xml_io import open_xml, resolve_xml_path
+
+# E1 (induction loop) and E2 (lane area) outputs written by ramp/detectors.add.xml
+detector_files = {
+    'e1': './Output/detectors_e1.xml',
+    'e2': './Output/detectors_e2.xml',
+}
+
+rows = []
+for kind, path in detector_files.items():
+    path = resolve_xml_path(path)
+    if not os.path.exists(path):
+        continue
+    with open_xml(path) as f:
+        root = ET.parse(f).getroot()
+    for interval in root.findall('interval'):
+        row = {'type': kind}
+        for key, value in interval.items():
+            try:
+                row[key] = float(value)
+            except ValueError:
+                row[key] = value
+        rows.append(row)
+
+df = pd.DataFrame(rows)
+df.to_csv('./Analysis/analysis_results/detectors.csv', index=False)
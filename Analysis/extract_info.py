@@ -4,6 +4,8 @@ import os
 import xml.etree.ElementTree as ET
 from statistics import mean
 
+from xml_io import open_xml, resolve_xml_path
+
 
 def extract_speeds_from_edg(edg_path):
     """Return mean highway speed and mean ramp speed from an .edg file."""
@@ -57,10 +59,12 @@ def extract_vehsperhour_from_rou(rou_path):
 
 
 def extract_mean_speed_from_summary(summary_path):
-    """Compute the average meanSpeed from SUMO summary.xml."""
+    """Compute the average meanSpeed from SUMO summary.xml (plain, .gz or .zst)."""
+    summary_path = resolve_xml_path(summary_path)
     if not os.path.exists(summary_path):
         return None
-    tree = ET.parse(summary_path)
+    with open_xml(summary_path) as f:
+        tree = ET.parse(f)
     root = tree.getroot()
 
     speeds = []
@@ -76,6 +80,45 @@ def extract_mean_speed_from_summary(summary_path):
     return mean(speeds) if speeds else None
 
 
+def mean_speed_from_steps_csv(steps_path):
+    """
+    Compute the average meanSpeed from summary_steps.csv written by summary_analysis.py.
+
+    Downsampled files hold one row per time window with its number of steps,
+    so window means are weighted by their steps to give the same value as the
+    mean over every step of the summary.
+    """
+    if not os.path.exists(steps_path):
+        return None
+    with open(steps_path, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        fields = reader.fieldnames or []
+        column = next((c for c in ('meanSpeed', 'meanSpeed_mean') if c in fields), None)
+        if column is None:
+            return None
+        total, weight = 0.0, 0.0
+        for row in reader:
+            try:
+                w = float(row['steps']) if 'steps' in fields else 1.0
+                total += float(row[column]) * w
+            except ValueError:
+                continue
+            weight += w
+    return total / weight if weight else None
+
+
+def derive_features(results_dir):
+    """
+    Return the dataset targets derived from the analysis CSVs in results_dir.
+
+    This is the single place that defines what a simulation contributes to the
+    dataset; the sweep and Analysis/backfill_dataset.py both call it.
+    """
+    return {
+        'meanSpeed_avg': mean_speed_from_steps_csv(os.path.join(results_dir, 'summary_steps.csv')),
+    }
+
+
 def write_row(out_path, row):
     """Write or append a row to a CSV, updating headers if needed."""
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
@@ -112,6 +155,8 @@ def main():
     parser.add_argument('--summary', default='../Output/summary.xml', help='Path to summary.xml file')
     parser.add_argument('--out', default='../NN/sim_summary_min.csv', help='Output CSV')
     parser.add_argument('--sim-id', default=None, help='Simulation identifier')
+    parser.add_argument('--results', default=None,
+                        help='Folder with the analysis CSVs; the targets are derived from them instead of --summary')
     args = parser.parse_args()
 
     sim_id = args.sim_id or os.path.splitext(os.path.basename(args.edg))[0]
@@ -124,7 +169,10 @@ def main():
 
     highway_speed, ramp_speed = extract_speeds_from_edg(edg_path)
     vph = extract_vehsperhour_from_rou(rou_path)
-    mean_speed = extract_mean_speed_from_summary(summary_path)
+    if args.results:
+        features = derive_features(os.path.normpath(os.path.join(base_dir, args.results)))
+    else:
+        features = {'meanSpeed_avg': extract_mean_speed_from_summary(summary_path)}
 
     row = {
         'sim_id': sim_id,
@@ -133,9 +181,11 @@ def main():
         'vehsPerHour_main': vph.get('main', 0.0),
         'vehsPerHour_ramp': vph.get('ramp', 0.0),
         'vehsPerHour_total': vph.get('total', 0.0),
-        'meanSpeed_avg': mean_speed,
+        **features,
     }
 
+    if row['meanSpeed_avg'] is None:
+        raise SystemExit(f'❌ No meanSpeed found for {sim_id}; nothing written to {out_path}')
     write_row(out_path, row)
     print(f'✅ Wrote simulation summary for {sim_id} to {out_path}')
 
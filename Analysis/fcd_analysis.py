@@ -0,0 +1,208 @@
+import argparse
+import csv
+import math
+import os
+import xml.etree.ElementTree as ET
+
+from xml_io import open_xml, resolve_xml_path
+
+RAMP_EDGE = 'ramp_0'
+MERGE_EDGE = 'main_1a'
+DOWNSTREAM_EDGE = 'main_1b'
+ACCEL_LANE = f'{MERGE_EDGE}_0'
+ZONE_PREFIXES = (RAMP_EDGE + '_', MERGE_EDGE + '_')
+VEHICLE_LENGTH = 5.0  # vType "car" in ramp.rou.xml; FCD does not report lengths
+
+
+class RunningStats:
+    """Count, mean, standard deviation, min and max without storing the values."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self._m2 += delta * (x - self.mean)
+        self.min = min(self.min, x)
+        self.max = max(self.max, x)
+
+    def as_dict(self, prefix):
+        if not self.n:
+            return {f'{prefix}_mean': '', f'{prefix}_std': '', f'{prefix}_min': '', f'{prefix}_max': ''}
+        return {
+            f'{prefix}_mean': round(self.mean, 3),
+            f'{prefix}_std': round(math.sqrt(self._m2 / self.n), 3),
+            f'{prefix}_min': round(self.min, 3),
+            f'{prefix}_max': round(self.max, 3),
+        }
+
+
+def gaps(occupancy, lane, pos):
+    """Return (lead gap, lag gap) around pos on a lane; None where the lane is empty."""
+    lead, lag = None, None
+    for other_pos in occupancy.get(lane, ()):
+        if other_pos > pos:
+            gap = other_pos - VEHICLE_LENGTH - pos
+            lead = gap if lead is None else min(lead, gap)
+        elif other_pos < pos:
+            gap = pos - VEHICLE_LENGTH - other_pos
+            lag = gap if lag is None else min(lag, gap)
+    return lead, lag
+
+
+class MergeReducer:
+    """
+    Online reduction of FCD timesteps to merge-zone metrics.
+
+    Only vehicles that enter from the ramp are tracked, and each is dropped as
+    soon as it has merged or left the merge edge, so memory is bounded by the
+    ramp vehicles currently in the merge zone plus one timestep of main_1a
+    lane positions (needed for the gaps a merging vehicle accepted).
+    """
+
+    def __init__(self):
+        self.active = {}          # ramp vehicle id -> tracking state
+        self.prev_occupancy = {}  # main_1a lane -> positions at the previous timestep
+        self.ramp_vehicles = 0
+        self.merged = 0
+        self.unmerged = 0
+        self.merge_pos = RunningStats()
+        self.merge_time_on_accel = RunningStats()
+        self.merge_speed = RunningStats()
+        self.speed_drop = RunningStats()
+        self.lead_gap = RunningStats()
+        self.lag_gap = RunningStats()
+        self.accepted_gap = RunningStats()
+
+    def _finish(self, vid, merged):
+        state = self.active.pop(vid)
+        if merged:
+            self.merged += 1
+        elif state['entry_speed'] is not None:
+            self.unmerged += 1
+
+    def timestep(self, time, vehicles):
+        """Consume one timestep given as a list of (id, lane, pos, speed)."""
+        occupancy = {}
+        seen = set()
+        for vid, lane, pos, speed in vehicles:
+            if lane.startswith(MERGE_EDGE + '_'):
+                occupancy.setdefault(lane, []).append(pos)
+
+        for vid, lane, pos, speed in vehicles:
+            state = self.active.get(vid)
+            if lane.startswith(RAMP_EDGE + '_'):
+                if state is None:
+                    self.ramp_vehicles += 1
+                    state = self.active[vid] = {'entry_speed': None, 'entry_time': None, 'min_speed': math.inf,
+                                                'prev_lane': None, 'prev_pos': None}
+                seen.add(vid)
+            elif state is None:
+                continue
+            elif lane.startswith(MERGE_EDGE + '_'):
+                seen.add(vid)
+                if state['entry_speed'] is None:
+                    state['entry_speed'] = speed
+                    state['entry_time'] = time
+                if lane == ACCEL_LANE:
+                    state['min_speed'] = min(state['min_speed'], speed)
+                elif state['prev_lane'] == ACCEL_LANE:
+                    self._record_merge(state, time, lane, pos, speed)
+                    self._finish(vid, merged=True)
+                    continue
+            elif lane.startswith(DOWNSTREAM_EDGE + '_'):
+                self._finish(vid, merged=False)
+                continue
+            else:
+                # Junction internal lane between the ramp and main_1a
+                seen.add(vid)
+                continue
+            state['prev_lane'] = lane
+            state['prev_pos'] = pos
+
+        # Vehicles that disappeared (arrived or teleported) are finalised as well
+        for vid in [v for v in self.active if v not in seen]:
+            self._finish(vid, merged=False)
+        self.prev_occupancy = occupancy
+
+    def _record_merge(self, state, time, lane, pos, speed):
+        self.merge_pos.add(pos)
+        self.merge_time_on_accel.add(time - state['entry_time'])
+        self.merge_speed.add(speed)
+        min_speed = min(state['min_speed'], speed)
+        self.speed_drop.add(max(state['entry_speed'] - min_speed, 0.0))
+
+        # Gaps the vehicle accepted: the target lane one step before the lane change
+        lead, lag = gaps(self.prev_occupancy, lane, state['prev_pos'])
+        if lead is not None:
+            self.lead_gap.add(lead)
+        if lag is not None:
+            self.lag_gap.add(lag)
+        if lead is not None and lag is not None:
+            self.accepted_gap.add(lead + lag + VEHICLE_LENGTH)
+
+    def close(self):
+        """Finalise the vehicles still in the merge zone when the output ends."""
+        for vid in list(self.active):
+            self._finish(vid, merged=False)
+
+    def record(self):
+        """Return the per-run summary row."""
+        row = {
+            'ramp_vehicles': self.ramp_vehicles,
+            'merged': self.merged,
+            'unmerged': self.unmerged,
+        }
+        row.update(self.merge_pos.as_dict('merge_pos'))
+        row.update(self.merge_time_on_accel.as_dict('merge_time_on_accel'))
+        row.update(self.merge_speed.as_dict('merge_speed'))
+        row.update(self.speed_drop.as_dict('speed_drop'))
+        row.update(self.lead_gap.as_dict('lead_gap'))
+        row.update(self.lag_gap.as_dict('lag_gap'))
+        row.update(self.accepted_gap.as_dict('accepted_gap'))
+        return row
+
+
+def reduce_fcd(fcd_path):
+    """Stream an FCD file (plain, .gz or .zst) through MergeReducer and return its record."""
+    reducer = MergeReducer()
+    with open_xml(resolve_xml_path(fcd_path)) as f:
+        context = ET.iterparse(f, events=('start', 'end'))
+        _event, root = next(context)
+        for event, elem in context:
+            if event != 'end' or elem.tag != 'timestep':
+                continue
+            vehicles = []
+            for veh in elem.iter('vehicle'):
+                vid, lane = veh.get('id'), veh.get('lane', '')
+                if lane.startswith(ZONE_PREFIXES) or vid in reducer.active:
+                    vehicles.append((vid, lane, float(veh.get('pos', 0.0)), float(veh.get('speed', 0.0))))
+            reducer.timestep(float(elem.get('time')), vehicles)
+            # Drop the processed timestep so the tree never grows
+            root.clear()
+    reducer.close()
+    return reducer.record()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reduce SUMO FCD output to merge-zone metrics.')
+    parser.add_argument('--fcd', default='./Output/fcd.xml', help='Path to the FCD file (plain, .gz or .zst)')
+    parser.add_argument('--out', default='./Analysis/analysis_results/merge_metrics.csv', help='Output CSV')
+    args = parser.parse_args()
+
+    row = reduce_fcd(args.fcd)
+    os.makedirs(os.path.dirname(args.out) or '.', exist_ok=True)
+    with open(args.out, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(row))
+        writer.writeheader()
+        writer.writerow(row)
+
+
+if __name__ == '__main__':
+    main()
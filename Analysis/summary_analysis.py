@@ -1,18 +1,127 @@
+import argparse
+import math
 import xml.etree.ElementTree as ET
+
 import pandas as pd
+from xml_io import open_xml, resolve_xml_path
+
+AGGREGATIONS = ('mean', 'min', 'max', 'last')
+
+
+class _Window:
+    """Running mean/min/max/last of every column over one time window."""
+
+    def __init__(self, start, values):
+        self.start = start
+        self.steps = 1
+        self.sums = list(values)
+        self.mins = list(values)
+        self.maxs = list(values)
+        self.last = list(values)
+
+    def add(self, values):
+        self.steps += 1
+        for k, v in enumerate(values):
+            self.sums[k] += v
+            if v < self.mins[k]:
+                self.mins[k] = v
+            if v > self.maxs[k]:
+                self.maxs[k] = v
+        self.last = list(values)
+
+    def row(self, aggs):
+        out = [self.start, self.steps]
+        for k in range(len(self.sums)):
+            for agg in aggs:
+                if agg == 'mean':
+                    out.append(self.sums[k] / self.steps)
+                elif agg == 'min':
+                    out.append(self.mins[k])
+                elif agg == 'max':
+                    out.append(self.maxs[k])
+                else:
+                    out.append(self.last[k])
+        return out
+
+
+def parse_summary(path, window=0.0, aggs=('mean',)):
+    """
+    Stream the <step> elements of a SUMO summary into a DataFrame.
+
+    With window > 0 the steps are aggregated on the fly into windows of that many
+    seconds: 'time' is the window start, 'steps' the number of steps it holds and
+    every other column is reduced with each aggregation in aggs. A single
+    aggregation keeps the original column names, several add a '_<agg>' suffix.
+    """
+    unknown = [a for a in aggs if a not in AGGREGATIONS]
+    if unknown:
+        raise ValueError(f"Unknown aggregation(s) {unknown}; choose from {AGGREGATIONS}")
+
+    columns, rows, current = None, [], None
+    with open_xml(resolve_xml_path(path)) as f:
+        for _event, step in ET.iterparse(f, events=('end',)):
+            if step.tag != 'step':
+                continue
+            if columns is None:
+                columns = [key for key in step.keys() if key != 'time']
+            time = float(step.get('time'))
+            values = [float(step.get(key)) for key in columns]
+            step.clear()
+
+            if window <= 0:
+                rows.append([time] + values)
+                continue
+            start = math.floor(time / window + 1e-9) * window
+            if current is not None and start != current.start:
+                rows.append(current.row(aggs))
+                current = None
+            if current is None:
+                current = _Window(start, values)
+            else:
+                current.add(values)
+
+    if current is not None:
+        rows.append(current.row(aggs))
+    if columns is None:
+        return pd.DataFrame()
+
+    if window <= 0:
+        header = ['time'] + columns
+    elif len(aggs) == 1:
+        header = ['time', 'steps'] + columns
+    else:
+        header = ['time', 'steps'] + [f'{col}_{agg}' for col in columns for agg in aggs]
+    return pd.DataFrame(rows, columns=header)
+
+
+def downcast(df, float_dtype='float32'):
+    """Store integral columns as the smallest integer type and the rest as float_dtype."""
+    for col in df.columns:
+        values = df[col]
+        if (values % 1 == 0).all():
+            df[col] = pd.to_numeric(values, downcast='integer')
+        else:
+            df[col] = values.astype(float_dtype)
+    return df
 
-# Parse the summary XML
-tree = ET.parse('./Output/summary.xml')
-root = tree.getroot()
 
-# Collect data from each step
-rows = []
-for step in root.findall('step'):
-    rows.append({key: float(step.get(key)) for key in step.keys()})
+def main():
+    parser = argparse.ArgumentParser(description='Convert a SUMO summary to CSV, optionally downsampled.')
+    parser.add_argument('--summary', default='./Output/summary.xml', help='Path to summary.xml file')
+    parser.add_argument('--out', default='./Analysis/analysis_results/summary_steps.csv', help='Output CSV')
+    parser.add_argument('--window', type=float, default=0.0,
+                        help='Aggregate steps into windows of this many seconds (0 keeps every step)')
+    parser.add_argument('--agg', default='mean',
+                        help=f'Comma-separated aggregations per window, from {", ".join(AGGREGATIONS)}')
+    parser.add_argument('--float-dtype', default='float32', choices=['float32', 'float64'],
+                        help='dtype of non-integral columns')
+    args = parser.parse_args()
 
-# Convert to DataFrame
-df = pd.DataFrame(rows)
+    aggs = tuple(a.strip() for a in args.agg.split(',') if a.strip())
+    df = parse_summary(args.summary, window=args.window, aggs=aggs)
+    df = downcast(df, float_dtype=args.float_dtype)
+    df.to_csv(args.out, index=False)
 
-# Save to CSV for analysis
-df.to_csv('./Analysis/analysis_results/summary_steps.csv', index=False)
 
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,9 @@
 import xml.etree.ElementTree as ET
 import pandas as pd
+from xml_io import open_xml, resolve_xml_path
 
-tree = ET.parse('./Output/tripinfo.xml')
+with open_xml(resolve_xml_path('./Output/tripinfo.xml')) as f:
+    tree = ET.parse(f)
 root = tree.getroot()
 
 rows = []
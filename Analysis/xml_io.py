@@ -0,0 +1,73 @@
+import gzip
+import os
+import shutil
+
+# Suffixes a SUMO output may carry besides plain '.xml'. SUMO writes '.gz'
+# natively when the output file name ends with it; '.zst' files are produced
+# by compress_file() after the run.
+COMPRESSED_SUFFIXES = ('.gz', '.zst')
+
+
+def _zstandard():
+    """Import zstandard lazily so gzip/plain XML keeps working without it."""
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("Reading or writing .zst files requires the 'zstandard' package "
+                          "(pip install zstandard)") from e
+    return zstandard
+
+
+def resolve_xml_path(path):
+    """
+    Return the existing variant of an XML output path (plain, .gz or .zst).
+
+    When several variants exist the most recently written one wins, so a stale
+    plain file from an earlier run never shadows a fresh compressed one.
+    Returns the path unchanged if no variant exists.
+    """
+    base = path
+    for suffix in COMPRESSED_SUFFIXES:
+        if base.endswith(suffix):
+            base = base[:-len(suffix)]
+    candidates = [p for p in [base] + [base + s for s in COMPRESSED_SUFFIXES] if os.path.exists(p)]
+    if not candidates:
+        return path
+    return max(candidates, key=os.path.getmtime)
+
+
+def open_xml(path):
+    """Open a plain, gzip or zstd XML file as a binary stream for ET.parse/iterparse."""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    if path.endswith('.zst'):
+        raw = open(path, 'rb')
+        return _zstandard().ZstdDecompressor().stream_reader(raw, closefd=True)
+    return open(path, 'rb')
+
+
+def compress_file(src, method='gzip', remove_source=True, level=None):
+    """
+    Stream-compress src to src + '.gz' or src + '.zst' and return the new path.
+
+    Args:
+        src (str): File to compress.
+        method (str): 'gzip' or 'zstd'.
+        remove_source (bool): Delete src once the compressed copy is written.
+        level (int): Compression level; defaults to 6 for gzip and 3 for zstd.
+    """
+    if method == 'gzip':
+        dst = src + '.gz'
+        with open(src, 'rb') as fin, gzip.open(dst, 'wb', compresslevel=level or 6) as fout:
+            shutil.copyfileobj(fin, fout)
+    elif method == 'zstd':
+        dst = src + '.zst'
+        cctx = _zstandard().ZstdCompressor(level=level or 3)
+        with open(src, 'rb') as fin, open(dst, 'wb') as fout:
+            cctx.copy_stream(fin, fout)
+    else:
+        raise ValueError(f"Unknown compression method '{method}' (use 'gzip' or 'zstd')")
+
+    if remove_source:
+        os.remove(src)
+    return dst
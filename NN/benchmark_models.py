@@ -0,0 +1,226 @@
+import argparse
+import hashlib
+import itertools
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import KFold, train_test_split
+
+NN_DIR = os.path.dirname(os.path.abspath(__file__))
+TARGET = "meanSpeed_avg"
+DROP_COLUMNS = [TARGET, "sim_id"]
+
+
+def make_knn(params):
+    from sklearn.neighbors import KNeighborsRegressor
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+    return make_pipeline(StandardScaler(), KNeighborsRegressor()).set_params(**params)
+
+
+def make_xgboost(params):
+    from xgboost import XGBRegressor
+    return XGBRegressor(random_state=42, n_jobs=1, **params)
+
+
+def make_random_forest(params):
+    from sklearn.ensemble import RandomForestRegressor
+    return RandomForestRegressor(random_state=42, n_jobs=1, **params)
+
+
+def make_catboost(params):
+    from catboost import CatBoostRegressor
+    return CatBoostRegressor(random_seed=42, thread_count=1, verbose=0, **params)
+
+
+# Model families with the search spaces used in Modellek_sumo.ipynb.
+# Each worker process runs single-threaded models, the pool provides the parallelism.
+MODEL_FAMILIES = {
+    "knn": (make_knn, {"kneighborsregressor__n_neighbors": list(range(2, 20))}),
+    "xgboost": (make_xgboost, {
+        "max_depth": [3, 4, 5, 6],
+        "learning_rate": [0.01, 0.05, 0.1],
+        "n_estimators": [100, 200, 300],
+    }),
+    "random_forest": (make_random_forest, {
+        "n_estimators": [100, 200, 300],
+        "max_depth": [5, 10, 15],
+        "min_samples_split": [2, 5],
+        "min_samples_leaf": [1, 2],
+    }),
+    "catboost": (make_catboost, {
+        "iterations": [300, 500],
+        "learning_rate": [0.05, 0.1],
+        "depth": [4, 6],
+    }),
+}
+
+
+def load_dataset(csv_path):
+    """Return (X, y) from a summary CSV as used in the notebook."""
+    df = pd.read_csv(csv_path).dropna(subset=[TARGET])
+    y = df[TARGET].to_numpy(dtype=float)
+    X = df.drop(columns=[c for c in DROP_COLUMNS if c in df.columns]).to_numpy(dtype=float)
+    return X, y
+
+
+def cached_splits(csv_path, cache_dir, n_splits=5, test_size=0.2, seed=42):
+    """
+    Return the path of an .npz holding the train/test split and the CV folds.
+
+    The file is keyed by a hash of the dataset and the split settings, so every
+    model family (and every later run on the same data) reuses the same folds.
+    """
+    with open(csv_path, "rb") as f:
+        digest = hashlib.sha1(f.read()).hexdigest()[:12]
+    path = os.path.join(cache_dir, f"cv_splits_{digest}_k{n_splits}_t{test_size}_s{seed}.npz")
+    if os.path.exists(path):
+        return path
+
+    X, _y = load_dataset(csv_path)
+    train_idx, test_idx = train_test_split(np.arange(len(X)), test_size=test_size, random_state=seed)
+    folds = {}
+    for k, (fit, val) in enumerate(KFold(n_splits=n_splits, shuffle=True, random_state=seed).split(train_idx)):
+        folds[f"fit_{k}"] = train_idx[fit]
+        folds[f"val_{k}"] = train_idx[val]
+    os.makedirs(cache_dir, exist_ok=True)
+    np.savez(path, train=train_idx, test=test_idx, n_splits=n_splits, **folds)
+    return path
+
+
+# Per-process state filled by _init_worker, so the data is loaded once per worker
+_WORKER = {}
+
+
+def _init_worker(csv_path, splits_path):
+    X, y = load_dataset(csv_path)
+    splits = np.load(splits_path)
+    _WORKER.update(X=X, y=y, splits={key: splits[key] for key in splits.files})
+
+
+def _fit_and_measure(family, params, fit_idx, eval_idx):
+    """Fit one model and return its scores, timings and size."""
+    X, y = _WORKER["X"], _WORKER["y"]
+    model = MODEL_FAMILIES[family][0](params)
+
+    t0 = time.perf_counter()
+    model.fit(X[fit_idx], y[fit_idx])
+    train_seconds = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    pred = model.predict(X[eval_idx])
+    batch_seconds = time.perf_counter() - t0
+
+    single = X[eval_idx[:1]]
+    single_times = []
+    for _ in range(20):
+        t0 = time.perf_counter()
+        model.predict(single)
+        single_times.append(time.perf_counter() - t0)
+
+    return {
+        "r2": r2_score(y[eval_idx], pred),
+        "mae": mean_absolute_error(y[eval_idx], pred),
+        "rmse": float(np.sqrt(mean_squared_error(y[eval_idx], pred))),
+        "train_seconds": train_seconds,
+        "batch_latency_us_per_row": batch_seconds / len(eval_idx) * 1e6,
+        "single_latency_us": float(np.median(single_times) * 1e6),
+        "model_bytes": len(pickle.dumps(model)),
+    }
+
+
+def evaluate_candidate(family, params):
+    """Cross-validate one (family, params) candidate on the cached folds."""
+    splits = _WORKER["splits"]
+    folds = [_fit_and_measure(family, params, splits[f"fit_{k}"], splits[f"val_{k}"])
+             for k in range(int(splits["n_splits"]))]
+    row = {"family": family, "params": repr(params)}
+    for key in folds[0]:
+        row[f"cv_{key}"] = float(np.mean([f[key] for f in folds]))
+    row["cv_r2_std"] = float(np.std([f["r2"] for f in folds]))
+    return row
+
+
+def evaluate_on_test(family, params):
+    """Refit a candidate on the whole training split and score it on the test split."""
+    splits = _WORKER["splits"]
+    result = _fit_and_measure(family, params, splits["train"], splits["test"])
+    return {"family": family, "params": repr(params), **{f"test_{k}": v for k, v in result.items()}}
+
+
+def candidates(family):
+    """Yield every parameter combination of a family's search space."""
+    grid = MODEL_FAMILIES[family][1]
+    keys = list(grid)
+    for values in itertools.product(*(grid[k] for k in keys)):
+        yield dict(zip(keys, values))
+
+
+def available_families(names):
+    """Return the requested families that exist and whose library can be imported."""
+    found = []
+    for name in names:
+        try:
+            MODEL_FAMILIES[name][0](next(candidates(name)))
+        except (ImportError, KeyError) as e:
+            print(f"⚠️ Skipping {name}: {e}")
+            continue
+        found.append(name)
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark model families on shared CV folds in a process pool.")
+    parser.add_argument("--csv", default=os.path.join(NN_DIR, "sim_summary_min.csv"), help="Training data")
+    parser.add_argument("--families", default=",".join(MODEL_FAMILIES), help="Comma-separated model families")
+    parser.add_argument("--folds", type=int, default=5, help="Number of CV folds")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--cache-dir", default=os.path.join(NN_DIR, "cache"), help="Where the CV splits are cached")
+    parser.add_argument("--results", default=os.path.join(NN_DIR, "benchmark_results.csv"),
+                        help="CSV with every evaluated candidate")
+    parser.add_argument("--leaderboard", default=os.path.join(NN_DIR, "leaderboard.csv"),
+                        help="CSV with the best candidate per family")
+    args = parser.parse_args()
+
+    families = available_families([f.strip() for f in args.families.split(",") if f.strip()])
+    if not families:
+        raise SystemExit("❌ None of the requested model families can be imported; nothing to benchmark.")
+    splits_path = cached_splits(args.csv, args.cache_dir, n_splits=args.folds)
+    tasks = [(family, params) for family in families for params in candidates(family)]
+    print(f"🚀 Evaluating {len(tasks)} candidates of {families} on {args.workers} workers")
+
+    rows = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(args.csv, splits_path)) as pool:
+        futures = [pool.submit(evaluate_candidate, family, params) for family, params in tasks]
+        for done, future in enumerate(as_completed(futures), start=1):
+            rows.append(future.result())
+            if done % 10 == 0 or done == len(futures):
+                print(f"   {done}/{len(futures)} candidates done")
+
+        results = pd.DataFrame(rows).sort_values("cv_r2", ascending=False)
+        best = results.groupby("family", sort=False).head(1)
+        params_by_key = {(family, repr(params)): params for family, params in tasks}
+        test_futures = [pool.submit(evaluate_on_test, r.family, params_by_key[(r.family, r.params)])
+                        for r in best.itertuples()]
+        test_rows = [f.result() for f in test_futures]
+
+    results.to_csv(args.results, index=False)
+    leaderboard = best.merge(pd.DataFrame(test_rows), on=["family", "params"])
+    leaderboard = leaderboard.sort_values("test_r2", ascending=False)
+    columns = ["family", "params", "cv_r2", "cv_r2_std", "test_r2", "test_mae", "test_rmse",
+               "test_train_seconds", "test_single_latency_us", "test_batch_latency_us_per_row", "test_model_bytes"]
+    leaderboard[columns].to_csv(args.leaderboard, index=False)
+
+    print(f"\n✅ Done in {time.perf_counter() - start:.1f} s")
+    print(leaderboard[columns].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+import argparse
+import bisect
+import itertools
+import json
+import os
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+# Grid axes, in the column names of sim_summary_min.csv. Speeds are in m/s.
+AXES = ("highway_speed", "ramp_speed", "vehsPerHour_main", "vehsPerHour_ramp")
+TARGET = "meanSpeed_avg"
+KMH_PER_MS = 3.6
+
+
+def predict_fn_from_csv(csv_path, target=TARGET):
+    """
+    Return a predict function interpolating simulated results from a summary CSV.
+
+    Linear interpolation is done over the axes that actually vary in the data
+    (constant columns would make the triangulation degenerate); points outside
+    the convex hull of the data fall back to the nearest simulated result.
+    """
+    from scipy.interpolate import LinearNDInterpolator, NearestNDInterpolator
+
+    df = pd.read_csv(csv_path).dropna(subset=list(AXES) + [target])
+    varying = [a for a in AXES if df[a].nunique() > 1]
+    if not varying:
+        value = float(df[target].mean())
+        return lambda points: np.full(len(points), value)
+
+    cols = [AXES.index(a) for a in varying]
+    x = df[varying].to_numpy(dtype=float)
+    y = df[target].to_numpy(dtype=float)
+    if len(varying) == 1:
+        order = np.argsort(x[:, 0])
+        return lambda points: np.interp(points[:, cols[0]], x[order, 0], y[order])
+
+    linear = LinearNDInterpolator(x, y)
+    nearest = NearestNDInterpolator(x, y)
+
+    def predict(points):
+        sub = points[:, cols]
+        out = linear(sub)
+        missing = np.isnan(out)
+        if missing.any():
+            out[missing] = nearest(sub[missing])
+        return out
+
+    return predict
+
+
+def predict_fn_from_model(model_path):
+    """
+    Return a predict function backed by a pickled regressor trained as in the
+    notebook (features: the four axes plus vehsPerHour_total).
+    """
+    with open(model_path, "rb") as f:
+        model = pickle.load(f)
+
+    def predict(points):
+        features = pd.DataFrame(points, columns=list(AXES))
+        features["vehsPerHour_total"] = features["vehsPerHour_main"] + features["vehsPerHour_ramp"]
+        return np.asarray(model.predict(features), dtype=float)
+
+    return predict
+
+
+class LookupGrid:
+    """
+    A dense, memory-mapped lookup grid of meanSpeed_avg over the four sweep
+    parameters, answering interpolated point, batch and inverse queries.
+    """
+
+    def __init__(self, axes, values):
+        """
+        Initialize the grid.
+
+        Args:
+            axes (list): One sorted 1-D array of node coordinates per entry of AXES.
+            values (np.ndarray): Array of shape [len(a) for a in axes], usually a memmap.
+        """
+        self.axes = [np.asarray(a, dtype=float) for a in axes]
+        self.values = values
+        # Plain lists make the scalar path (bisect) much cheaper than numpy calls.
+        self._axes_lists = [a.tolist() for a in self.axes]
+
+    @classmethod
+    def build(cls, path, axes, predict_fn, dtype="float32"):
+        """
+        Evaluate predict_fn on every grid node and store the result at path.
+
+        The grid is written to '<path>.npy' one highway-speed slice at a time, so
+        memory stays bounded by a single slice; the axes go to '<path>.json'.
+        """
+        axes = [np.asarray(a, dtype=float) for a in axes]
+        shape = tuple(len(a) for a in axes)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        values = np.lib.format.open_memmap(path + ".npy", mode="w+", dtype=dtype, shape=shape)
+
+        rest = np.stack(np.meshgrid(*axes[1:], indexing="ij"), axis=-1).reshape(-1, len(axes) - 1)
+        for i, hs in enumerate(axes[0]):
+            points = np.column_stack([np.full(len(rest), hs), rest])
+            values[i] = np.asarray(predict_fn(points), dtype=float).reshape(shape[1:])
+        values.flush()
+
+        with open(path + ".json", "w", encoding="utf-8") as f:
+            json.dump({"axes": dict(zip(AXES, [a.tolist() for a in axes])), "target": TARGET}, f)
+        return cls.open(path)
+
+    @classmethod
+    def open(cls, path):
+        """Open a grid written by build() without loading it into memory."""
+        with open(path + ".json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        values = np.load(path + ".npy", mmap_mode="r")
+        return cls([meta["axes"][a] for a in AXES], values)
+
+    def _locate(self, dim, x):
+        """Return (lower node index, weight of the upper node) for one coordinate."""
+        axis = self._axes_lists[dim]
+        if len(axis) == 1 or x <= axis[0]:
+            return 0, 0.0
+        if x >= axis[-1]:
+            return len(axis) - 2, 1.0
+        i = bisect.bisect_right(axis, x) - 1
+        return i, (x - axis[i]) / (axis[i + 1] - axis[i])
+
+    def query(self, highway_speed, ramp_speed, main_flow, ramp_flow):
+        """Interpolate meanSpeed_avg at one point (coordinates are clamped to the grid)."""
+        located = [self._locate(d, float(x)) for d, x in
+                   enumerate((highway_speed, ramp_speed, main_flow, ramp_flow))]
+        result = 0.0
+        for corner in itertools.product((0, 1), repeat=len(located)):
+            weight = 1.0
+            index = []
+            for (i, t), bit in zip(located, corner):
+                if bit:
+                    if t == 0.0:
+                        break
+                    weight *= t
+                else:
+                    weight *= 1.0 - t
+                index.append(i + bit)
+            else:
+                if weight:
+                    result += weight * float(self.values[tuple(index)])
+        return result
+
+    def query_batch(self, points):
+        """Interpolate meanSpeed_avg for an (N, 4) array of points at once."""
+        points = np.atleast_2d(np.asarray(points, dtype=float))
+        lower, weight = [], []
+        for d, axis in enumerate(self.axes):
+            x = points[:, d]
+            if len(axis) == 1:
+                lower.append(np.zeros(len(x), dtype=np.intp))
+                weight.append(np.zeros(len(x)))
+                continue
+            i = np.clip(np.searchsorted(axis, x, side="right") - 1, 0, len(axis) - 2)
+            t = np.clip((x - axis[i]) / (axis[i + 1] - axis[i]), 0.0, 1.0)
+            lower.append(i)
+            weight.append(t)
+
+        offsets = [(0,) if len(a) == 1 else (0, 1) for a in self.axes]
+        result = np.zeros(len(points))
+        for corner in itertools.product(*offsets):
+            w = np.ones(len(points))
+            index = []
+            for i, t, bit in zip(lower, weight, corner):
+                w *= t if bit else 1.0 - t
+                index.append(i + bit)
+            result += w * self.values[tuple(index)]
+        return result
+
+    def max_ramp_flow(self, highway_speed, ramp_speed, main_flow, min_speed):
+        """
+        Return the largest ramp flow keeping meanSpeed_avg >= min_speed, or None.
+
+        Along the ramp axis the interpolant is piecewise linear between nodes,
+        so the crossing is solved exactly inside the last segment that satisfies
+        the threshold.
+        """
+        ramp_axis = self.axes[3]
+        points = np.column_stack([
+            np.full(len(ramp_axis), highway_speed),
+            np.full(len(ramp_axis), ramp_speed),
+            np.full(len(ramp_axis), main_flow),
+            ramp_axis,
+        ])
+        speeds = self.query_batch(points)
+        ok = speeds >= min_speed
+        if not ok.any():
+            return None
+        last = int(np.flatnonzero(ok)[-1])
+        if last == len(ramp_axis) - 1:
+            return float(ramp_axis[-1])
+        s0, s1 = speeds[last], speeds[last + 1]
+        t = (s0 - min_speed) / (s0 - s1) if s0 != s1 else 0.0
+        return float(ramp_axis[last] + t * (ramp_axis[last + 1] - ramp_axis[last]))
+
+
+def benchmark(grid, n_single=10000, n_batch=100000, seed=0):
+    """Time single and batch queries on random points inside the grid; return stats."""
+    rng = np.random.default_rng(seed)
+    low = np.array([a[0] for a in grid.axes])
+    high = np.array([a[-1] for a in grid.axes])
+    points = rng.uniform(low, high, size=(max(n_single, n_batch), len(AXES)))
+
+    single = points[:n_single].tolist()
+    timings = np.empty(n_single)
+    for k, p in enumerate(single):
+        t0 = time.perf_counter()
+        grid.query(*p)
+        timings[k] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    grid.query_batch(points[:n_batch])
+    batch_seconds = time.perf_counter() - t0
+
+    return {
+        "single_p50_us": float(np.percentile(timings, 50) * 1e6),
+        "single_p99_us": float(np.percentile(timings, 99) * 1e6),
+        "single_max_us": float(timings.max() * 1e6),
+        "batch_rows": n_batch,
+        "batch_total_ms": batch_seconds * 1e3,
+        "batch_per_row_us": batch_seconds / n_batch * 1e6,
+    }
+
+
+def _axis(spec):
+    """Parse a start:stop:step axis specification (stop inclusive)."""
+    start, stop, step = map(float, spec.split(":"))
+    return np.round(np.arange(start, stop + step / 2, step), 6)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="What-if queries on a precomputed meanSpeed_avg lookup grid.")
+    parser.add_argument("--grid", default=os.path.join(os.path.dirname(__file__), "lookup", "mean_speed_grid"),
+                        help="Grid path without extension (.npy/.json are added)")
+    parser.add_argument("--kmh", action="store_true", help="Speeds on the command line are in km/h instead of m/s")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Precompute the grid")
+    build.add_argument("--csv", default=os.path.join(os.path.dirname(__file__), "sim_summary_min.csv"),
+                       help="Simulated results to interpolate")
+    build.add_argument("--model", default=None, help="Pickled surrogate model to use instead of --csv")
+    build.add_argument("--highway-speed", default="25:127.5:2.5", help="start:stop:step in m/s")
+    build.add_argument("--ramp-speed", default="15:97.5:2.5", help="start:stop:step in m/s")
+    build.add_argument("--main-flow", default="800:4950:50", help="start:stop:step in veh/h")
+    build.add_argument("--ramp-flow", default="200:1975:25", help="start:stop:step in veh/h")
+
+    query = sub.add_parser("query", help="Point query")
+    query.add_argument("highway_speed", type=float)
+    query.add_argument("ramp_speed", type=float)
+    query.add_argument("main_flow", type=float)
+    query.add_argument("ramp_flow", type=float)
+
+    batch = sub.add_parser("batch", help="Batch query from a CSV with the four axis columns")
+    batch.add_argument("input")
+    batch.add_argument("--out", default=None, help="Output CSV (default: print)")
+
+    inverse = sub.add_parser("inverse", help="Max ramp flow keeping mean speed above a threshold")
+    inverse.add_argument("highway_speed", type=float)
+    inverse.add_argument("ramp_speed", type=float)
+    inverse.add_argument("main_flow", type=float)
+    inverse.add_argument("min_speed", type=float)
+
+    bench = sub.add_parser("bench", help="Latency benchmark")
+    bench.add_argument("--single", type=int, default=10000)
+    bench.add_argument("--batch", type=int, default=100000)
+    args = parser.parse_args()
+
+    scale = 1.0 / KMH_PER_MS if args.kmh else 1.0
+
+    if args.command == "build":
+        if args.model:
+            predict_fn = predict_fn_from_model(args.model)
+        else:
+            predict_fn = predict_fn_from_csv(args.csv)
+        axes = [_axis(args.highway_speed), _axis(args.ramp_speed), _axis(args.main_flow), _axis(args.ramp_flow)]
+        t0 = time.perf_counter()
+        grid = LookupGrid.build(args.grid, axes, predict_fn)
+        print(f"✅ Built grid {grid.values.shape} at {args.grid}.npy in {time.perf_counter() - t0:.1f} s")
+        return
+
+    grid = LookupGrid.open(args.grid)
+    if args.command == "query":
+        speed = grid.query(args.highway_speed * scale, args.ramp_speed * scale, args.main_flow, args.ramp_flow)
+        print(f"{TARGET}: {speed:.3f} m/s ({speed * KMH_PER_MS:.1f} km/h)")
+    elif args.command == "batch":
+        df = pd.read_csv(args.input)
+        points = df[list(AXES)].to_numpy(dtype=float)
+        points[:, :2] *= scale
+        df[TARGET] = grid.query_batch(points)
+        if args.out:
+            df.to_csv(args.out, index=False)
+        else:
+            print(df.to_string(index=False))
+    elif args.command == "inverse":
+        flow = grid.max_ramp_flow(args.highway_speed * scale, args.ramp_speed * scale, args.main_flow,
+                                  args.min_speed * scale)
+        if flow is None:
+            print("No ramp flow on the grid keeps the mean speed above the threshold.")
+        else:
+            print(f"Max ramp flow: {flow:.0f} veh/h")
+    elif args.command == "bench":
+        for key, value in benchmark(grid, args.single, args.batch).items():
+            print(f"{key}: {value:.3f}" if isinstance(value, float) else f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
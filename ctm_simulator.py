@@ -0,0 +1,371 @@
+import argparse
+import csv
+import json
+import os
+import time
+
+import numpy as np
+
+# Edges of ramp/ramp.net.xml as (lanes, length in m). main_1a has an extra
+# acceleration lane, of which only a share is usable as through capacity.
+MAIN_EDGES = (("main_0", 2, 492.79), ("main_1a", 3, 397.96), ("main_1b", 2, 596.00))
+RAMP_EDGE = ("ramp_0", 1, 144.50)
+MERGE_EDGE = "main_1a"
+
+VTYPE_MAX_SPEED = 38.0  # vType "car" in ramp.rou.xml
+JAM_SPACING = 7.5       # vehicle length 5 m + SUMO's default minGap 2.5 m
+FLOW_SECONDS = 600.0    # flows in ramp.rou.xml
+END_SECONDS = 900.0     # ramp.sumocfg
+
+# Fitted on NN/sim_summary_min.csv with `python ctm_simulator.py calibrate`
+# (RMSE 0.78 m/s on meanSpeed_avg of the 529 stored SUMO runs)
+DEFAULT_CALIBRATION = {
+    "capacity": 2674.0,
+    "speed_factor": 1.076,
+    "speed_drop": 0.237,
+    "accel_lane_share": 0.525,
+    "ramp_priority": 0.283,
+    "merge_capacity": 2300.0,
+}
+
+# Calibration search ranges (uniform)
+CALIBRATION_BOUNDS = {
+    "capacity": (1400.0, 2800.0),
+    "speed_factor": (0.8, 1.4),
+    "speed_drop": (0.0, 0.45),
+    "accel_lane_share": (0.0, 1.0),
+    "ramp_priority": (0.05, 0.7),
+    "merge_capacity": (600.0, 2400.0),
+}
+
+DATASET_FIELDS = ["sim_id", "highway_speed", "ramp_speed", "vehsPerHour_main", "vehsPerHour_ramp",
+                  "vehsPerHour_total", "meanSpeed_avg"]
+
+
+def _mid(a, b, c):
+    """Elementwise median of three arrays."""
+    return np.maximum(np.minimum(a, b), np.minimum(np.maximum(a, b), c))
+
+
+class CellTransmissionModel:
+    """
+    Batched cell transmission model of the on-ramp scenario.
+
+    Every edge is split into cells of at least cell_length metres with a
+    fundamental diagram per lane that is parabolic below capacity (car
+    following slows traffic down by speed_drop as the lane fills up) and
+    linear above it, down to the jam density 1/JAM_SPACING. main_0 and ramp_0
+    feed main_1a through a Daganzo merge, where the ramp can send at most
+    merge_capacity (merging needs accepted gaps, so the ramp queues long before
+    main_1a is full), and main_1a drops to the two lanes of main_1b. Vehicles
+    that cannot enter wait in point queues in front of main_0 and ramp_0 and,
+    as in SUMO, do not count as running.
+
+    All state is held in (batch, cell) arrays, so thousands of parameter sets
+    advance together. The calibration parameters may themselves be arrays of
+    the batch size, which is how calibrate() scores many candidates at once.
+    """
+
+    def __init__(self, capacity=DEFAULT_CALIBRATION["capacity"], speed_factor=DEFAULT_CALIBRATION["speed_factor"],
+                 speed_drop=DEFAULT_CALIBRATION["speed_drop"],
+                 accel_lane_share=DEFAULT_CALIBRATION["accel_lane_share"],
+                 ramp_priority=DEFAULT_CALIBRATION["ramp_priority"],
+                 merge_capacity=DEFAULT_CALIBRATION["merge_capacity"], dt=1.0, cell_length=40.0):
+        """
+        Initialize the model.
+
+        Args:
+            capacity (float or array): Capacity per lane in veh/h.
+            speed_factor (float or array): Free speed as a multiple of the edge speed (SUMO's speedFactor).
+            speed_drop (float or array): Relative speed loss between an empty lane and capacity (0..0.5).
+            accel_lane_share (float or array): Usable share of main_1a's acceleration lane (0..1).
+            ramp_priority (float or array): Share of the merge supply given to the ramp when it is congested.
+            merge_capacity (float or array): Most veh/h that can merge from the ramp (gap acceptance limit).
+            dt (float): Time step in s; dt * VTYPE_MAX_SPEED must not exceed cell_length.
+            cell_length (float): Minimum cell length in m.
+        """
+        if dt * VTYPE_MAX_SPEED > cell_length:
+            raise ValueError("cell_length must be at least dt * VTYPE_MAX_SPEED for a stable simulation")
+        self.capacity = capacity
+        self.speed_factor = speed_factor
+        self.speed_drop = speed_drop
+        self.accel_lane_share = accel_lane_share
+        self.ramp_priority = ramp_priority
+        self.merge_capacity = merge_capacity
+        self.dt = dt
+        self.cell_length = cell_length
+
+        lanes, lengths, merge_lane = [], [], []
+        for name, n_lanes, length in MAIN_EDGES:
+            n_cells = max(1, int(length // cell_length))
+            if name == MERGE_EDGE:
+                self.merge_cell = len(lanes)
+            lanes += [n_lanes] * n_cells
+            lengths += [length / n_cells] * n_cells
+            merge_lane += [name == MERGE_EDGE] * n_cells
+        self.lanes = np.asarray(lanes, dtype=float)
+        self.lengths = np.asarray(lengths)
+        self.on_merge_edge = np.asarray(merge_lane)
+        n_ramp = max(1, int(RAMP_EDGE[2] // cell_length))
+        self.ramp_lanes = float(RAMP_EDGE[1])
+        self.ramp_lengths = np.full(n_ramp, RAMP_EDGE[2] / n_ramp)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """Create a model from a calibration JSON written by save(); defaults if it does not exist."""
+        calibration = dict(DEFAULT_CALIBRATION)
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                calibration.update({k: v for k, v in json.load(f).items() if k in DEFAULT_CALIBRATION})
+        return cls(**calibration, **kwargs)
+
+    def save(self, path, **extra):
+        """Write the (scalar) calibration parameters to a JSON file."""
+        data = {k: float(getattr(self, k)) for k in DEFAULT_CALIBRATION}
+        data.update(extra)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+    def simulate(self, highway_speed, ramp_speed, mainline_flow, rampline_flow):
+        """
+        Simulate a batch of parameter sets and return a dict of (batch,) arrays.
+
+        meanSpeed_avg is computed like Analysis/extract_info.py does on SUMO's
+        summary: the mean over all steps of the mean speed of the running
+        vehicles, counting -1 for steps with an empty network. The dict also
+        holds the mean number of running vehicles and the largest insertion queue.
+        """
+        hs, rs, qm, qr = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in
+                                                (highway_speed, ramp_speed, mainline_flow, rampline_flow)))
+        batch = hs.shape[0] if hs.ndim else 1
+        hs, rs, qm, qr = (a.reshape(batch) for a in (hs, rs, qm, qr))
+
+        def per_set(value):
+            return np.broadcast_to(np.asarray(value, dtype=float), (batch,))[:, None]
+
+        dt = self.dt
+        kj = 1.0 / JAM_SPACING
+        q_lane = per_set(self.capacity) / 3600.0
+        speed_factor = per_set(self.speed_factor)
+        drop = per_set(self.speed_drop)
+        priority = per_set(self.ramp_priority)[:, 0]
+        merge_max = per_set(self.merge_capacity)[:, 0] / 3600.0 * dt
+
+        def diagram(free_speed, lanes, lengths):
+            """Per-cell constants of the fundamental diagram: (vf, w, critical vehicles, jam vehicles, q_max)."""
+            vf = np.minimum(free_speed[:, None] * speed_factor, VTYPE_MAX_SPEED)
+            # Critical density, kept below jam density for very slow edges
+            kc = np.minimum(q_lane / (vf * (1.0 - drop)), 0.9 * kj)
+            w = q_lane / (kj - kc)
+            return vf, w, kc * lanes * lengths, kj * lanes * lengths, q_lane * lanes * dt
+
+        def cell_state(n, lengths, vf, w, n_crit, n_max, q_max):
+            """Speeds, sending (demand) and receiving (supply) flows of the cells for one step."""
+            free = vf * (1.0 - drop * np.minimum(n / n_crit, 1.0))
+            speed = np.minimum(free, w * (n_max - n) / np.maximum(n, 1e-9))
+            demand = np.minimum(free * n / lengths * dt, q_max)
+            supply = np.clip(w * (n_max - n) / lengths * dt, 0.0, q_max)
+            return speed, demand, supply
+
+        # Main cells: lanes vary per set on main_1a because of the acceleration lane share
+        lanes = np.where(self.on_merge_edge, self.lanes - 1.0 + per_set(self.accel_lane_share), self.lanes)
+        main = (self.lengths, *diagram(hs, lanes, self.lengths))
+        ramp = (self.ramp_lengths, *diagram(rs, self.ramp_lanes, self.ramp_lengths))
+
+        n = np.zeros((batch, len(self.lengths)))
+        n_r = np.zeros((batch, len(self.ramp_lengths)))
+        queue_m = np.zeros(batch)
+        queue_r = np.zeros(batch)
+        max_queue = np.zeros(batch)
+        arrivals_m = qm / 3600.0 * dt
+        arrivals_r = qr / 3600.0 * dt
+        m = self.merge_cell
+
+        steps = int(round(END_SECONDS / dt))
+        speed_sum = np.zeros(batch)
+        running_sum = np.zeros(batch)
+        for step in range(steps):
+            speed, demand, supply = cell_state(n, *main)
+            speed_r, demand_r, supply_r = cell_state(n_r, *ramp)
+
+            # Speeds and running vehicles at the start of the step (what SUMO's summary reports)
+            running = n.sum(axis=1) + n_r.sum(axis=1)
+            mean_speed = ((speed * n).sum(axis=1) + (speed_r * n_r).sum(axis=1)) / np.maximum(running, 1e-9)
+            # An (almost) empty network counts as SUMO's -1, blended to keep the tail smooth
+            occupied = np.minimum(running, 1.0)
+            speed_sum += occupied * mean_speed - (1.0 - occupied)
+            running_sum += running
+
+            flow = np.minimum(demand[:, :-1], supply[:, 1:])
+            flow_r = np.minimum(demand_r[:, :-1], supply_r[:, 1:])
+
+            # Merge of main_0 and ramp_0 into the first main_1a cell
+            d_main, d_ramp, s_merge = demand[:, m - 1], np.minimum(demand_r[:, -1], merge_max), supply[:, m]
+            congested = d_main + d_ramp > s_merge
+            y_ramp = np.where(congested, _mid(d_ramp, s_merge - d_main, priority * s_merge), d_ramp)
+            y_main = np.where(congested, s_merge - y_ramp, d_main)
+            flow[:, m - 1] = y_main
+
+            # Insertion from the point queues while the flows are active
+            if step * dt < FLOW_SECONDS:
+                queue_m += arrivals_m
+                queue_r += arrivals_r
+            enter_m = np.minimum(queue_m, supply[:, 0])
+            enter_r = np.minimum(queue_r, supply_r[:, 0])
+            queue_m -= enter_m
+            queue_r -= enter_r
+            max_queue = np.maximum(max_queue, queue_m + queue_r)
+
+            n[:, 0] += enter_m
+            n[:, 1:] += flow
+            n[:, :-1] -= flow
+            n[:, m] += y_ramp
+            n[:, -1] -= demand[:, -1]
+            n_r[:, 0] += enter_r
+            n_r[:, 1:] += flow_r
+            n_r[:, :-1] -= flow_r
+            n_r[:, -1] -= y_ramp
+
+        return {
+            "meanSpeed_avg": speed_sum / steps,
+            "running_avg": running_sum / steps,
+            "max_queue": max_queue,
+        }
+
+    def predict(self, points):
+        """meanSpeed_avg for an (n, 4) array of highway_speed, ramp_speed, main and ramp flow."""
+        points = np.asarray(points, dtype=float)
+        return self.simulate(points[:, 0], points[:, 1], points[:, 2], points[:, 3])["meanSpeed_avg"]
+
+
+def load_reference(csv_path):
+    """Return (points, meanSpeed_avg) of the SUMO results in a summary CSV."""
+    points, targets = [], []
+    with open(csv_path, "r", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            try:
+                points.append([float(row["highway_speed"]), float(row["ramp_speed"]),
+                               float(row["vehsPerHour_main"]), float(row["vehsPerHour_ramp"])])
+                targets.append(float(row["meanSpeed_avg"]))
+            except (KeyError, ValueError):
+                continue
+    return np.asarray(points), np.asarray(targets)
+
+
+def calibrate(csv_path, n_candidates=48, rounds=6, max_rows=192, seed=42, **model_kwargs):
+    """
+    Fit the calibration parameters to stored SUMO results.
+
+    Each round draws n_candidates parameter sets (the first round over
+    CALIBRATION_BOUNDS, later rounds in a shrinking box around the best one)
+    and simulates every candidate on up to max_rows reference rows in a single
+    batch. Returns (model, rmse) of the best candidate.
+    """
+    rng = np.random.default_rng(seed)
+    points, targets = load_reference(csv_path)
+    if len(points) > max_rows:
+        keep = rng.choice(len(points), max_rows, replace=False)
+        points, targets = points[keep], targets[keep]
+
+    names = list(CALIBRATION_BOUNDS)
+    lower = np.array([CALIBRATION_BOUNDS[k][0] for k in names])
+    upper = np.array([CALIBRATION_BOUNDS[k][1] for k in names])
+    best = np.array([DEFAULT_CALIBRATION[k] for k in names])
+    best_rmse = np.inf
+    span = upper - lower
+    for _round in range(rounds):
+        candidates = np.clip(best + (rng.random((n_candidates, len(names))) - 0.5) * span, lower, upper)
+        candidates[0] = best
+        # Every (candidate, reference row) pair is one element of the batch
+        params = np.repeat(candidates, len(points), axis=0)
+        tiled = np.tile(points, (n_candidates, 1))
+        model = CellTransmissionModel(**dict(zip(names, params.T)), **model_kwargs)
+        predicted = model.predict(tiled).reshape(n_candidates, len(points))
+        rmse = np.sqrt(((predicted - targets) ** 2).mean(axis=1))
+        if rmse.min() < best_rmse:
+            best_rmse = float(rmse.min())
+            best = candidates[int(rmse.argmin())]
+        span = span / 2.0
+    return CellTransmissionModel(**dict(zip(names, best.tolist())), **model_kwargs), best_rmse
+
+
+def write_rows(path, first_id, points, mean_speeds, prefix="ctm"):
+    """Append simulated rows to a dataset CSV in the sim_summary_min.csv format."""
+    new_file = not os.path.exists(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=DATASET_FIELDS)
+        if new_file:
+            writer.writeheader()
+        for k, ((hs, rs, qm, qr), speed) in enumerate(zip(points, mean_speeds)):
+            writer.writerow({
+                "sim_id": f"{prefix}_{first_id + k:04d}",
+                "highway_speed": hs,
+                "ramp_speed": rs,
+                "vehsPerHour_main": qm,
+                "vehsPerHour_ramp": qr,
+                "vehsPerHour_total": qm + qr,
+                "meanSpeed_avg": round(float(speed), 6),
+            })
+
+
+def main():
+    project = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Vectorized cell transmission model of the on-ramp scenario.")
+    parser.add_argument("--calibration", default=os.path.join(project, "NN", "ctm_calibration.json"),
+                        help="Calibration JSON (defaults are used if it does not exist)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    cal = sub.add_parser("calibrate", help="Fit the model to stored SUMO results and save the calibration")
+    cal.add_argument("--csv", default=os.path.join(project, "NN", "sim_summary_min.csv"), help="SUMO results")
+    cal.add_argument("--candidates", type=int, default=48, help="Candidates per round")
+    cal.add_argument("--rounds", type=int, default=6, help="Search rounds")
+    cal.add_argument("--max-rows", type=int, default=192, help="Reference rows used per candidate")
+
+    sim = sub.add_parser("simulate", help="Simulate one parameter set")
+    sim.add_argument("highway_speed", type=float)
+    sim.add_argument("ramp_speed", type=float)
+    sim.add_argument("main_flow", type=float)
+    sim.add_argument("ramp_flow", type=float)
+
+    val = sub.add_parser("validate", help="Compare the model with stored SUMO results")
+    val.add_argument("--csv", default=os.path.join(project, "NN", "sim_summary_min.csv"), help="SUMO results")
+
+    bench = sub.add_parser("bench", help="Throughput on random parameter sets")
+    bench.add_argument("--batch", type=int, default=10000)
+    args = parser.parse_args()
+
+    if args.command == "calibrate":
+        t0 = time.perf_counter()
+        model, rmse = calibrate(args.csv, args.candidates, args.rounds, args.max_rows)
+        model.save(args.calibration, rmse=rmse)
+        params = ", ".join(f"{k}={getattr(model, k):.3f}" for k in DEFAULT_CALIBRATION)
+        print(f"✅ Calibrated in {time.perf_counter() - t0:.1f} s: {params} (RMSE {rmse:.3f} m/s)")
+        print(f"   → {args.calibration}")
+        return
+
+    model = CellTransmissionModel.load(args.calibration)
+    if args.command == "simulate":
+        result = model.simulate(args.highway_speed, args.ramp_speed, args.main_flow, args.ramp_flow)
+        for key, values in result.items():
+            print(f"{key}: {float(values[0]):.3f}")
+    elif args.command == "validate":
+        points, targets = load_reference(args.csv)
+        predicted = model.predict(points)
+        error = predicted - targets
+        print(f"rows: {len(targets)}")
+        print(f"RMSE: {np.sqrt((error ** 2).mean()):.3f} m/s, MAE: {np.abs(error).mean():.3f} m/s, "
+              f"bias: {error.mean():+.3f} m/s")
+    elif args.command == "bench":
+        rng = np.random.default_rng(0)
+        points = np.column_stack([rng.uniform(25, 129.5, args.batch), rng.uniform(15, 99.5, args.batch),
+                                  rng.uniform(800, 4950, args.batch), rng.uniform(200, 1975, args.batch)])
+        t0 = time.perf_counter()
+        model.predict(points)
+        elapsed = time.perf_counter() - t0
+        print(f"{args.batch} parameter sets in {elapsed:.2f} s ({args.batch / elapsed:.0f} sets/s)")
+
+
+if __name__ == "__main__":
+    main()
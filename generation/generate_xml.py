@@ -1,3 +1,4 @@
+import os
 import xml.etree.ElementTree as ET
 from xml.dom import minidom
 
@@ -170,3 +171,74 @@ class RouteXMLGenerator:
         print(f"✅ XML file '{self.output_file}' generated successfully.")
 
 
+class DetectorXMLGenerator:
+    """
+    A class to generate a SUMO additional file with E1 (induction loop) and
+    E2 (lane area) detectors at the merge on the acceleration-lane segment.
+    """
+
+    def __init__(self, edge: str = "main_1a", num_lanes: int = 3, e1_pos: float = 10.0,
+                 e2_pos: float = 0.0, e2_length: float = 200.0, period: float = 900.0,
+                 e1_output: str = "Output/detectors_e1.xml", e2_output: str = "Output/detectors_e2.xml",
+                 output_file: str = "ramp/detectors.add.xml"):
+        """
+        Initialize the detector generator.
+
+        Args:
+            edge (str): Edge carrying the detectors (the merge segment).
+            num_lanes (int): Number of lanes of the edge; one detector of each kind per lane.
+            e1_pos (float): Position of the induction loops from the start of the edge [m].
+            e2_pos (float): Start of the lane area detectors [m].
+            e2_length (float): Length of the lane area detectors [m].
+            period (float): Aggregation period of the detector outputs [s].
+            e1_output (str): Output file of the induction loops (relative to the project).
+            e2_output (str): Output file of the lane area detectors (relative to the project).
+            output_file (str): Output XML filename.
+        """
+        self.edge = edge
+        self.num_lanes = num_lanes
+        self.e1_pos = e1_pos
+        self.e2_pos = e2_pos
+        self.e2_length = e2_length
+        self.period = period
+        self.output_file = output_file
+
+        # SUMO resolves file attributes relative to the additional file itself
+        add_dir = os.path.dirname(os.path.abspath(output_file))
+        self.e1_file = os.path.relpath(os.path.abspath(e1_output), add_dir).replace(os.sep, "/")
+        self.e2_file = os.path.relpath(os.path.abspath(e2_output), add_dir).replace(os.sep, "/")
+
+    def generate_xml(self):
+        """Generate the XML structure and write it to a file."""
+        additional = ET.Element("additional")
+
+        additional.append(ET.Comment(f"E1 induction loops on every lane of {self.edge}"))
+        for lane in range(self.num_lanes):
+            ET.SubElement(additional, "inductionLoop", {
+                "id": f"e1_{self.edge}_{lane}",
+                "lane": f"{self.edge}_{lane}",
+                "pos": f"{self.e1_pos}",
+                "period": f"{self.period}",
+                "file": self.e1_file,
+            })
+
+        additional.append(ET.Comment(f"E2 lane area detectors over the merge zone of {self.edge}"))
+        for lane in range(self.num_lanes):
+            ET.SubElement(additional, "laneAreaDetector", {
+                "id": f"e2_{self.edge}_{lane}",
+                "lane": f"{self.edge}_{lane}",
+                "pos": f"{self.e2_pos}",
+                "length": f"{self.e2_length}",
+                "period": f"{self.period}",
+                "file": self.e2_file,
+            })
+
+        # Pretty-print and write to file
+        xml_str = minidom.parseString(ET.tostring(additional, encoding="utf-8")).toprettyxml(indent="  ")
+        with open(self.output_file, "w", encoding="utf-8") as f:
+            f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+            for line in xml_str.splitlines()[1:]:  # Skip redundant header
+                if line.strip():
+                    f.write(line + "\n")
+
+        print(f"✅ XML file '{self.output_file}' generated successfully.")
@@ -0,0 +1,114 @@
+import numpy as np
+
+
+class ParameterSampler:
+    """
+    A class to draw space-filling parameter sets (Latin hypercube, Sobol or
+    Halton) over the four sweep parameters, keeping highway_speed > ramp_speed.
+    """
+
+    METHODS = ("lhs", "sobol", "halton")
+    PARAMETERS = ("highway_speed", "ramp_speed", "mainline_flow", "rampline_flow")
+
+    def __init__(self, method: str = "sobol", seed: int = 42,
+                 highway_speed=(25.0, 129.5), ramp_speed=(15.0, 99.5),
+                 mainline_flow=(800, 4950), rampline_flow=(200, 1975),
+                 speed_decimals: int = 2, block_size: int = 256):
+        """
+        Initialize the sampler.
+
+        Args:
+            method (str): Design to draw from: "lhs", "sobol" or "halton".
+            seed (int): Seed of the design; the same seed gives the same points.
+            highway_speed (tuple): (min, max) highway speed.
+            ramp_speed (tuple): (min, max) ramp speed.
+            mainline_flow (tuple): (min, max) mainline vehicles per hour.
+            rampline_flow (tuple): (min, max) ramp vehicles per hour.
+            speed_decimals (int): Speeds are rounded to this many decimals.
+            block_size (int): Number of raw points drawn from the engine at once.
+                Points are always drawn in blocks of this size, so the stream of
+                points only depends on the seed and never on how it is consumed.
+                For "lhs" every block is a Latin hypercube of its own.
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"method must be one of {self.METHODS}, got '{method}'")
+        if block_size <= 0:
+            raise ValueError("block_size must be positive")
+
+        self.method = method
+        self.seed = seed
+        self.speed_decimals = speed_decimals
+        self.block_size = block_size
+
+        bounds = [highway_speed, ramp_speed, mainline_flow, rampline_flow]
+        self.lower = np.array([float(b[0]) for b in bounds])
+        self.upper = np.array([float(b[1]) for b in bounds])
+        if np.any(self.upper < self.lower):
+            raise ValueError("every (min, max) bound must have min <= max")
+        if self.upper[0] <= self.lower[1]:
+            raise ValueError("no point satisfies highway_speed > ramp_speed with these bounds")
+
+        self.position = 0      # raw design points consumed so far
+        self._seen = set()     # accepted points, so extending never repeats one
+        self._engine = self._make_engine()
+        self._buffer = np.empty((0, len(self.PARAMETERS)))
+
+    def _make_engine(self):
+        """Create the scipy.stats.qmc engine for the chosen design."""
+        # Imported here so the default grid sweep does not need scipy
+        from scipy.stats import qmc
+
+        d = len(self.PARAMETERS)
+        if self.method == "lhs":
+            return qmc.LatinHypercube(d=d, seed=self.seed)
+        if self.method == "sobol":
+            return qmc.Sobol(d=d, scramble=True, seed=self.seed)
+        return qmc.Halton(d=d, scramble=True, seed=self.seed)
+
+    def _next_unit_point(self):
+        """Return the next raw point of the design in the unit hypercube."""
+        if len(self._buffer) == 0:
+            self._buffer = self._engine.random(self.block_size)
+        point, self._buffer = self._buffer[0], self._buffer[1:]
+        self.position += 1
+        return point
+
+    def _to_params(self, unit_point):
+        """Scale a unit point to the parameter bounds; None if it breaks the constraint."""
+        hs, rs, mf, rf = self.lower + unit_point * (self.upper - self.lower)
+        hs = round(float(hs), self.speed_decimals)
+        rs = round(float(rs), self.speed_decimals)
+        if hs <= rs:
+            return None
+        return {
+            "highway_speed": hs,
+            "ramp_speed": rs,
+            "mainline_flow": int(round(mf)),
+            "rampline_flow": int(round(rf)),
+        }
+
+    def skip(self, n: int):
+        """
+        Advance past the next n valid points, e.g. to extend a design of which
+        an earlier run with the same seed already simulated the first n points.
+        """
+        for _params in self.generate(n):
+            pass
+
+    def generate(self, n: int):
+        """Yield the next n valid parameter dicts (streaming, memory-light)."""
+        produced = 0
+        while produced < n:
+            params = self._to_params(self._next_unit_point())
+            if params is None:
+                continue
+            key = tuple(params.values())
+            if key in self._seen:
+                continue
+            self._seen.add(key)
+            produced += 1
+            yield params
+
+    def sample(self, n: int):
+        """Return the next n valid parameter dicts as a list."""
+        return list(self.generate(n))
@@ -0,0 +1,327 @@
+"""
+Stand-in for the `sumo` binary used to load-test the sweep without SUMO.
+
+It accepts the same command line as the real call in run_multiple_simulations.py
+(-c, --summary-output, --tripinfo-output, --edgedata-output, --fcd-output,
+--additional-files; other options are ignored) and writes synthetic outputs in
+SUMO's format. Output size scales like SUMO's: one summary step per step-length
+over the configured horizon, one tripinfo per vehicle generated by the route
+flows and one FCD entry per running vehicle and step. Paths ending in .gz are
+gzip-compressed, as SUMO does.
+
+Set FAKE_SUMO_DELAY_PER_VEHICLE (seconds) to emulate simulation runtime.
+"""
+import argparse
+import bisect
+import gzip
+import math
+import os
+import random
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+# Rough per-lane capacity used to slow traffic down as the flows grow.
+LANE_CAPACITY = 2000.0
+
+
+def open_output(path):
+    """Open an output file for writing text, gzip-compressed if it ends in .gz."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if path.endswith('.gz'):
+        return gzip.open(path, 'wt', encoding='utf-8')
+    return open(path, 'w', encoding='utf-8')
+
+
+def read_config(cfg_path):
+    """Return net/route file paths and begin/end/step-length from a .sumocfg."""
+    root = ET.parse(cfg_path).getroot()
+    base = os.path.dirname(os.path.abspath(cfg_path))
+
+    def value(tag, default=None):
+        el = root.find(f'.//{tag}')
+        return el.get('value') if el is not None else default
+
+    return {
+        'net': os.path.join(base, value('net-file')),
+        'routes': [os.path.join(base, r.strip()) for r in value('route-files', '').split(',') if r.strip()],
+        'additional': [os.path.join(base, a.strip()) for a in value('additional-files', '').split(',') if a.strip()],
+        'begin': float(value('begin', 0)),
+        'end': float(value('end', 3600)),
+        'step': float(value('step-length', 1.0)),
+    }
+
+
+def read_edges(net_path):
+    """Return {edge_id: (length, speed, num_lanes)} for the non-internal edges of a net."""
+    edges = {}
+    for edge in ET.parse(net_path).getroot().findall('edge'):
+        if edge.get('function') == 'internal':
+            continue
+        lanes = edge.findall('lane')
+        if not lanes:
+            continue
+        edges[edge.get('id')] = (float(lanes[0].get('length')), float(lanes[0].get('speed')), len(lanes))
+    return edges
+
+
+def read_flows(route_paths):
+    """Return the flows of the route files as dicts (id, begin, end, vph, edges)."""
+    flows = []
+    for path in route_paths:
+        for flow in ET.parse(path).getroot().iter('flow'):
+            route = flow.find('route')
+            flows.append({
+                'id': flow.get('id'),
+                'begin': float(flow.get('begin', 0)),
+                'end': float(flow.get('end', 3600)),
+                'vph': float(flow.get('vehsPerHour', 0)),
+                'edges': route.get('edges').split() if route is not None else [],
+            })
+    return flows
+
+
+def simulate(cfg, edges, flows, seed):
+    """Build synthetic vehicles: (id, depart, arrival, route, speed factor, edge times)."""
+    rng = random.Random(seed)
+    # The narrowest edge shared by the flows is the bottleneck.
+    shared = set.intersection(*(set(f['edges']) for f in flows)) if flows else set()
+    lanes = min((edges[e][2] for e in shared if e in edges), default=2)
+    load = sum(f['vph'] for f in flows) / (LANE_CAPACITY * lanes)
+    congestion = max(0.3, 1.0 - 0.25 * load ** 2)
+
+    vehicles = []
+    for f in flows:
+        if f['vph'] <= 0:
+            continue
+        n = math.ceil(f['vph'] * (f['end'] - f['begin']) / 3600.0 - 1e-9)
+        headway = 3600.0 / f['vph']
+        for i in range(n):
+            depart = round(f['begin'] + i * headway, 2)
+            factor = min(1.2, max(0.8, rng.gauss(1.0, 0.1))) * congestion
+            times = [edges[e][0] / (edges[e][1] * factor) for e in f['edges'] if e in edges]
+            vehicles.append({
+                'id': f'{f["id"]}.{i}',
+                'depart': depart,
+                'arrival': depart + sum(times),
+                'edges': [e for e in f['edges'] if e in edges],
+                'times': times,
+                'factor': factor,
+            })
+    return vehicles
+
+
+def write_summary(path, cfg, vehicles, edges):
+    """Write one <step> per step-length over the configured horizon."""
+    departs = sorted(v['depart'] for v in vehicles)
+    arrivals = sorted(v['arrival'] for v in vehicles)
+    durations = sorted((v['arrival'], v['arrival'] - v['depart']) for v in vehicles)
+    mean_free = sum(e[1] for e in edges.values()) / max(len(edges), 1)
+    mean_factor = sum(v['factor'] for v in vehicles) / max(len(vehicles), 1)
+
+    steps = int(round((cfg['end'] - cfg['begin']) / cfg['step']))
+    done_total, done_count = 0.0, 0
+    with open_output(path) as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n\n')
+        f.write('<summary xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+                'xsi:noNamespaceSchemaLocation="http://sumo.dlr.de/xsd/summary_file.xsd">\n')
+        for k in range(steps):
+            t = cfg['begin'] + k * cfg['step']
+            loaded = bisect.bisect_right(departs, t)
+            arrived = bisect.bisect_right(arrivals, t)
+            while done_count < len(durations) and durations[done_count][0] <= t:
+                done_total += durations[done_count][1]
+                done_count += 1
+            running = loaded - arrived
+            mean_speed = mean_free * mean_factor if running else -1.0
+            mean_travel = done_total / done_count if done_count else -1.0
+            f.write(f'    <step time="{t:.2f}" loaded="{loaded}" inserted="{loaded}" running="{running}" '
+                    f'waiting="0" ended="{arrived}" arrived="{arrived}" collisions="0" teleports="0" '
+                    f'halting="0" stopped="0" meanWaitingTime="0.00" meanTravelTime="{mean_travel:.2f}" '
+                    f'meanSpeed="{mean_speed:.2f}" meanSpeedRelative="{mean_factor if running else -1.0:.2f}" '
+                    f'duration="0"/>\n')
+        f.write('</summary>\n')
+
+
+def write_tripinfo(path, cfg, vehicles, edges):
+    """Write one <tripinfo> per vehicle that arrived within the horizon."""
+    with open_output(path) as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n\n')
+        f.write('<tripinfos xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+                'xsi:noNamespaceSchemaLocation="http://sumo.dlr.de/xsd/tripinfo_file.xsd">\n')
+        for v in sorted(vehicles, key=lambda v: v['arrival']):
+            if v['arrival'] > cfg['end']:
+                continue
+            duration = v['arrival'] - v['depart']
+            length = sum(edges[e][0] for e in v['edges'])
+            free = sum(edges[e][0] / edges[e][1] for e in v['edges'])
+            f.write(f'    <tripinfo id="{v["id"]}" depart="{v["depart"]:.2f}" departLane="{v["edges"][0]}_0" '
+                    f'departPos="5.10" departSpeed="{edges[v["edges"][0]][1]:.2f}" departDelay="0.00" '
+                    f'arrival="{v["arrival"]:.2f}" arrivalLane="{v["edges"][-1]}_0" '
+                    f'arrivalPos="{edges[v["edges"][-1]][0]:.2f}" arrivalSpeed="{edges[v["edges"][-1]][1]:.2f}" '
+                    f'duration="{duration:.2f}" routeLength="{length:.2f}" waitingTime="0.00" '
+                    f'waitingCount="0" stopTime="0.00" timeLoss="{max(0.0, duration - free):.2f}" rerouteNo="0" '
+                    f'devices="tripinfo_{v["id"]}" vType="car" speedFactor="{v["factor"]:.2f}" vaporized=""/>\n')
+        f.write('</tripinfos>\n')
+
+
+def write_edgedata(path, cfg, vehicles, edges):
+    """Write a single meandata interval covering the horizon."""
+    horizon = cfg['end'] - cfg['begin']
+    stats = {e: {'seconds': 0.0, 'entered': 0, 'departed': 0, 'left': 0, 'arrived': 0} for e in edges}
+    for v in vehicles:
+        t = v['depart']
+        for k, (e, dt) in enumerate(zip(v['edges'], v['times'])):
+            if t > cfg['end']:
+                break
+            s = stats[e]
+            s['seconds'] += min(dt, cfg['end'] - t)
+            s['departed' if k == 0 else 'entered'] += 1
+            t += dt
+            if t <= cfg['end']:
+                s['arrived' if k == len(v['edges']) - 1 else 'left'] += 1
+
+    with open_output(path) as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n\n')
+        f.write('<meandata xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+                'xsi:noNamespaceSchemaLocation="http://sumo.dlr.de/xsd/meandata_file.xsd">\n')
+        f.write(f'    <interval begin="{cfg["begin"]:.2f}" end="{cfg["end"]:.2f}" id="DEFAULT_EDGEDATA">\n')
+        for e, (length, speed, lanes) in edges.items():
+            s = stats[e]
+            density = s['seconds'] / horizon / (length / 1000.0)
+            passed = s['entered'] + s['departed']
+            mean_speed = length * passed / s['seconds'] if s['seconds'] else speed
+            f.write(f'        <edge id="{e}" sampledSeconds="{s["seconds"]:.2f}" '
+                    f'traveltime="{length / max(mean_speed, 0.1):.2f}" density="{density:.2f}" '
+                    f'laneDensity="{density / lanes:.2f}" occupancy="0.00" waitingTime="0.00" '
+                    f'speed="{min(mean_speed, speed * 1.2):.2f}" speedRelative="{min(mean_speed / speed, 1.2):.2f}" '
+                    f'departed="{s["departed"]}" arrived="{s["arrived"]}" entered="{s["entered"]}" '
+                    f'left="{s["left"]}" laneChangedFrom="0" laneChangedTo="0"/>\n')
+        f.write('    </interval>\n')
+        f.write('</meandata>\n')
+
+
+def write_fcd(path, cfg, vehicles, edges):
+    """
+    Write one <timestep> per step-length with a <vehicle> per running vehicle.
+
+    Vehicles keep a lane per edge; those coming from a ramp enter a multi-lane
+    edge on its rightmost (acceleration) lane and change lanes halfway along
+    it, so the FCD reducer sees merges.
+    """
+    order = sorted(vehicles, key=lambda v: v['depart'])
+    steps = int(round((cfg['end'] - cfg['begin']) / cfg['step']))
+    active, next_vehicle = [], 0
+    with open_output(path) as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n\n')
+        f.write('<fcd-export xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+                'xsi:noNamespaceSchemaLocation="http://sumo.dlr.de/xsd/fcd_file.xsd">\n')
+        for k in range(steps):
+            t = cfg['begin'] + k * cfg['step']
+            while next_vehicle < len(order) and order[next_vehicle]['depart'] <= t:
+                active.append(order[next_vehicle])
+                next_vehicle += 1
+            active = [v for v in active if v['arrival'] > t]
+            f.write(f'    <timestep time="{t:.2f}">\n')
+            for v in active:
+                index = int(v['id'].rsplit('.', 1)[-1])
+                elapsed, x = t - v['depart'], 0.0
+                for n, (e, dt) in enumerate(zip(v['edges'], v['times'])):
+                    if elapsed < dt or n == len(v['edges']) - 1:
+                        break
+                    elapsed -= dt
+                    x += edges[e][0]
+                length, speed, lanes = edges[e]
+                pos = min(length, elapsed / dt * length)
+                from_ramp = 'ramp' in v['edges'][0] and n > 0
+                if from_ramp and n == 1 and lanes > 1:
+                    lane = 0 if pos < length / 2 else 1
+                else:
+                    lane = index % (lanes - 1) + 1 if lanes > 2 else index % lanes
+                f.write(f'        <vehicle id="{v["id"]}" x="{x + pos:.2f}" y="0.00" angle="90.00" type="car" '
+                        f'speed="{speed * v["factor"]:.2f}" pos="{pos:.2f}" lane="{e}_{lane}" slope="0.00"/>\n')
+            f.write('    </timestep>\n')
+        f.write('</fcd-export>\n')
+
+
+def write_detectors(additional_files, cfg, vehicles, edges):
+    """Write E1/E2 intervals for the detectors declared in the additional files."""
+    detectors = {}  # output path -> [(tag, id, edge)]
+    for add_path in additional_files:
+        base = os.path.dirname(os.path.abspath(add_path))
+        for det in ET.parse(add_path).getroot():
+            if det.tag not in ('inductionLoop', 'laneAreaDetector') or not det.get('file'):
+                continue
+            out = os.path.normpath(os.path.join(base, det.get('file')))
+            period = float(det.get('period', det.get('freq', cfg['end'] - cfg['begin'])))
+            detectors.setdefault(out, []).append((det.tag, det.get('id'), det.get('lane').rsplit('_', 1)[0], period))
+
+    for out, dets in detectors.items():
+        with open_output(out) as f:
+            f.write('<?xml version="1.0" encoding="UTF-8"?>\n\n<detector>\n')
+            for tag, det_id, edge, period in dets:
+                lanes = sum(1 for d in dets if d[0] == tag and d[2] == edge)
+                passing = [v for v in vehicles if edge in v['edges']]
+                begin = cfg['begin']
+                while begin < cfg['end']:
+                    end = min(begin + period, cfg['end'])
+                    n = sum(1 for v in passing if begin <= v['depart'] < end) / lanes
+                    speed = sum(v['factor'] for v in passing) / len(passing) * edges[edge][1] if passing else -1.0
+                    if tag == 'inductionLoop':
+                        f.write(f'    <interval begin="{begin:.2f}" end="{end:.2f}" id="{det_id}" '
+                                f'nVehContrib="{n:.0f}" flow="{n * 3600 / (end - begin):.2f}" occupancy="0.00" '
+                                f'speed="{speed:.2f}" harmonicMeanSpeed="{speed:.2f}" length="5.00" '
+                                f'nVehEntered="{n:.0f}"/>\n')
+                    else:
+                        f.write(f'    <interval begin="{begin:.2f}" end="{end:.2f}" id="{det_id}" '
+                                f'sampledSeconds="0.00" nVehEntered="{n:.0f}" nVehLeft="{n:.0f}" '
+                                f'nVehSeen="{n:.0f}" meanSpeed="{speed:.2f}" meanTimeLoss="0.00" '
+                                f'meanOccupancy="0.00" maxOccupancy="0.00" meanMaxJamLengthInVehicles="0.00" '
+                                f'meanMaxJamLengthInMeters="0.00" maxJamLengthInVehicles="0" '
+                                f'maxJamLengthInMeters="0.00" jamLengthInVehiclesSum="0" '
+                                f'jamLengthInMetersSum="0.00" meanHaltingDuration="0.00" '
+                                f'maxHaltingDuration="0.00" haltingDurationSum="0.00" '
+                                f'meanIntervalHaltingDuration="0.00" maxIntervalHaltingDuration="0.00" '
+                                f'intervalHaltingDurationSum="0.00" startedHalts="0.00" meanVehicleNumber="0.00" '
+                                f'maxVehicleNumber="0"/>\n')
+                    begin = end
+            f.write('</detector>\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Fake SUMO for load tests.')
+    parser.add_argument('-c', '--configuration-file', dest='config', required=True)
+    parser.add_argument('--summary-output', default=None)
+    parser.add_argument('--tripinfo-output', default=None)
+    parser.add_argument('--edgedata-output', default=None)
+    parser.add_argument('--fcd-output', default=None)
+    parser.add_argument('-a', '--additional-files', default=None)
+    parser.add_argument('--seed', type=int, default=23423)
+    args, _unknown = parser.parse_known_args(argv)
+
+    cfg = read_config(args.config)
+    edges = read_edges(cfg['net'])
+    flows = read_flows(cfg['routes'])
+    vehicles = simulate(cfg, edges, flows, args.seed)
+
+    if args.summary_output:
+        write_summary(args.summary_output, cfg, vehicles, edges)
+    if args.tripinfo_output:
+        write_tripinfo(args.tripinfo_output, cfg, vehicles, edges)
+    if args.edgedata_output:
+        write_edgedata(args.edgedata_output, cfg, vehicles, edges)
+    if args.fcd_output:
+        write_fcd(args.fcd_output, cfg, vehicles, edges)
+    additional = args.additional_files.split(',') if args.additional_files else cfg['additional']
+    write_detectors([a for a in additional if a.strip()], cfg, vehicles, edges)
+
+    delay = float(os.environ.get('FAKE_SUMO_DELAY_PER_VEHICLE', 0) or 0)
+    if delay > 0:
+        time.sleep(delay * len(vehicles))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""
+Drive run_multiple_simulations.py against the fake `sumo` in this folder and
+report throughput, file-system pressure and memory.
+
+The sweep runs in a throw-away copy of the project so the real
+Analysis/analysis_results and NN/sim_summary_min.csv are never touched.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:  # memory then falls back to the peak RSS reported by the OS
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+LOADTEST_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(LOADTEST_DIR)
+
+
+def create_workspace(root):
+    """Copy the files the sweep needs into root/Project_lab and return its path."""
+    workspace = os.path.join(root, 'Project_lab')
+    os.makedirs(workspace)
+    for folder in ('ramp', 'generation'):
+        shutil.copytree(os.path.join(PROJECT_DIR, folder), os.path.join(workspace, folder),
+                        ignore=shutil.ignore_patterns('__pycache__'))
+    os.makedirs(os.path.join(workspace, 'Analysis', 'analysis_results'))
+    for name in os.listdir(os.path.join(PROJECT_DIR, 'Analysis')):
+        if name.endswith('.py'):
+            shutil.copy2(os.path.join(PROJECT_DIR, 'Analysis', name), os.path.join(workspace, 'Analysis', name))
+    os.makedirs(os.path.join(workspace, 'Output'))
+    os.makedirs(os.path.join(workspace, 'NN'))
+    for name in ('run_multiple_simulations.py', 'sweep_scheduler.py', 'ctm_simulator.py'):
+        shutil.copy2(os.path.join(PROJECT_DIR, name), workspace)
+    return workspace
+
+
+def directory_usage(path):
+    """Return (total bytes, number of files) below path."""
+    total, files = 0, 0
+    for dirpath, _dirnames, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+                files += 1
+            except OSError:  # file moved or removed while walking
+                pass
+    return total, files
+
+
+def tree_rss(pid):
+    """Return the summed RSS in bytes of a process and all its children (needs psutil)."""
+    try:
+        proc = psutil.Process(pid)
+        procs = [proc] + proc.children(recursive=True)
+    except psutil.Error:
+        return 0
+    total = 0
+    for p in procs:
+        try:
+            total += p.memory_info().rss
+        except psutil.Error:
+            pass
+    return total
+
+
+class Monitor(threading.Thread):
+    """Background sampler of workspace size, free disk and memory of the sweep."""
+
+    def __init__(self, workspace, pid, interval):
+        super().__init__(daemon=True)
+        self.workspace = workspace
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        size, files = directory_usage(self.workspace)
+        self.samples.append({
+            'time': time.perf_counter(),
+            'bytes': size,
+            'files': files,
+            'free_disk': shutil.disk_usage(self.workspace).free,
+            'rss': tree_rss(self.pid) if psutil else None,
+        })
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.sample()
+
+
+def count_completed(workspace):
+    """Count iteration folders of completed runs (the sweep writes params.json last)."""
+    results = os.path.join(workspace, 'Analysis', 'analysis_results')
+    return sum(1 for name in os.listdir(results)
+               if name.startswith('iteration_') and os.path.exists(os.path.join(results, name, 'params.json')))
+
+
+def run_load_test(iterations, interval=5.0, keep=False, delay_per_vehicle=0.0):
+    """Run a capped sweep against the fake SUMO and return the report dict."""
+    root = tempfile.mkdtemp(prefix='sumo_loadtest_')
+    workspace = create_workspace(root)
+    log_path = os.path.join(root, 'sweep.log')
+
+    env = dict(os.environ)
+    env['PATH'] = LOADTEST_DIR + os.pathsep + env.get('PATH', '')
+    # The sweep imports generation/, Analysis/ and its sibling modules from the project folder
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [workspace, env.get('PYTHONPATH')]))
+    env['PYTHONIOENCODING'] = 'utf-8'
+    env['FAKE_SUMO_DELAY_PER_VEHICLE'] = str(delay_per_vehicle)
+    code = f'import run_multiple_simulations as sweep; sweep.main(max_iterations={int(iterations)})'
+
+    start = time.perf_counter()
+    with open(log_path, 'w', encoding='utf-8') as log:
+        proc = subprocess.Popen([sys.executable, '-c', code], cwd=workspace, env=env,
+                                stdout=log, stderr=subprocess.STDOUT)
+        monitor = Monitor(workspace, proc.pid, interval)
+        monitor.start()
+        returncode = proc.wait()
+        monitor.stop()
+    wall = time.perf_counter() - start
+
+    completed = count_completed(workspace)
+    final = monitor.samples[-1]
+    rss = [s['rss'] for s in monitor.samples if s['rss'] is not None]
+    peak_rss = max(rss) if rss else None
+    if peak_rss is None and resource is not None:
+        # ru_maxrss is in KiB on Linux; it covers the largest waited-for descendant.
+        peak_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024
+
+    report = {
+        'requested_iterations': iterations,
+        'completed_iterations': completed,
+        'returncode': returncode,
+        'wall_seconds': round(wall, 2),
+        'iterations_per_second': round(completed / wall, 3) if wall else None,
+        'seconds_per_iteration': round(wall / completed, 3) if completed else None,
+        'workspace_bytes': final['bytes'],
+        'workspace_files': final['files'],
+        'bytes_per_iteration': final['bytes'] // completed if completed else None,
+        'files_per_iteration': round(final['files'] / completed, 2) if completed else None,
+        'write_rate_mb_per_second': round(final['bytes'] / wall / 1e6, 3) if wall else None,
+        'peak_workspace_bytes': max(s['bytes'] for s in monitor.samples),
+        'min_free_disk_bytes': min(s['free_disk'] for s in monitor.samples),
+        'peak_rss_bytes': peak_rss,
+        'workspace': workspace if keep else None,
+        'log': log_path if keep else None,
+    }
+    if not keep:
+        shutil.rmtree(root, ignore_errors=True)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the simulation sweep with a fake SUMO binary.')
+    parser.add_argument('--iterations', type=int, default=10000, help='Number of sweep iterations to run')
+    parser.add_argument('--interval', type=float, default=5.0, help='Seconds between file-system/memory samples')
+    parser.add_argument('--delay-per-vehicle', type=float, default=0.0,
+                        help='Seconds the fake SUMO sleeps per simulated vehicle')
+    parser.add_argument('--keep', action='store_true', help='Keep the temporary workspace and sweep log')
+    parser.add_argument('--report', default=None, help='Write the report as JSON to this path')
+    args = parser.parse_args()
+
+    report = run_load_test(args.iterations, args.interval, args.keep, args.delay_per_vehicle)
+    for key, value in report.items():
+        print(f'{key}: {value}')
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
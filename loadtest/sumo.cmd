@@ -0,0 +1,3 @@
+@echo off
+rem Fake `sumo` executable for Windows; put this folder first on PATH to use it.
+python "%~dp0fake_sumo.py" %*
@@ -1,404 +1,58 @@
+import json
 import os
 import subprocess
 import shutil
+import threading
+import time
 from datetime import datetime
-from generation.generate_xml import RouteXMLGenerator, EdgeXMLGenerator
-
-
-def run_command(command):
-    """Run a shell command. Return True on success, False on failure.
-
-    Captures stderr for easier debugging on failures.
-    """
-    proc = subprocess.run(command, shell=True, capture_output=True, text=True)
-    if proc.returncode != 0:
-        print(f"Warning: Command '{command}' failed with error:\n{proc.stderr}")
-        return False
-    return True
-
-
-def generate_new_routes(mainline_flow, rampline_flow, routes_file="ramp/ramp.rou.xml"):
-    """Generate routes using RouteXMLGenerator with explicit flow rates."""
-    generator = RouteXMLGenerator(
-        mainline_vehs_per_hour=int(mainline_flow),
-        rampline_vehs_per_hour=int(rampline_flow),
-        output_file=routes_file,
-    )
-    generator.generate_xml()
-    return routes_file
-
-
-def generate_new_edges(highway_speed, ramp_speed, edges_file="ramp/ramp.edg.xml"):
-    """Generate edges using EdgeXMLGenerator with explicit speeds."""
-    edge_generator = EdgeXMLGenerator(
-        highway_speed=float(highway_speed),
-        ramp_speed=float(ramp_speed),
-        output_file=edges_file,
-    )
-    edge_generator.generate_xml()
-    return edges_file
-
-
-def parse_list_or_range(s: str):
-    """Parse a comma-separated list or a start:stop:step range into floats."""
-    s = str(s)
-    if ':' in s:
-        parts = s.split(':')
-        if len(parts) != 3:
-            raise ValueError('Range form must be start:stop:step')
-        start, stop, step = map(float, parts)
-        values = []
-        v = start
-        if step == 0:
-            raise ValueError('step must be non-zero')
-        if step > 0:
-            while v <= stop:
-                values.append(round(v, 6))
-                v += step
-        else:
-            while v >= stop:
-                values.append(round(v, 6))
-                v += step
-        return values
-    else:
-        parts = [p.strip() for p in s.split(',') if p.strip()]
-        return [float(p) for p in parts]
-
-
-def count_valid_combinations(highway_speeds, ramp_speeds, mainline_flows, ramp_flows):
-    """Count combinations where highway_speed > ramp_speed without building the full grid."""
-    c = 0
-    for hs in highway_speeds:
-        for rs in ramp_speeds:
-            if float(hs) <= float(rs):
-                continue
-            for mf in mainline_flows:
-                for rf in ramp_flows:
-                    c += 1
-    return c
-
-
-def build_filtered_generator(highway_speeds, ramp_speeds, mainline_flows, ramp_flows):
-    """Yield parameter dicts where highway_speed > ramp_speed (streaming, memory-light)."""
-    for hs in highway_speeds:
-        for rs in ramp_speeds:
-            if float(hs) <= float(rs):
-                continue
-            for mf in mainline_flows:
-                for rf in ramp_flows:
-                    yield {
-                        'highway_speed': float(hs),
-                        'ramp_speed': float(rs),
-                        'mainline_flow': int(mf),
-                        'rampline_flow': int(rf),
-                    }
-
-
-def frange(start, stop, step):
-    """Float range generator (inclusive when step fits exactly)."""
-    x = float(start)
-    if step == 0:
-        raise ValueError('step must be non-zero')
-    if step > 0:
-        while x <= stop:
-            yield round(x, 6)
-            x += step
-    else:
-        while x >= stop:
-            yield round(x, 6)
-            x += step
-
-
-def create_iteration_folder(iteration):
-    """Create a folder for this iteration's results"""
-    folder = f"Analysis/analysis_results/iteration_{iteration}"
-    os.makedirs(folder, exist_ok=True)
-    return folder
-
-
-def main():
-    # Hard-coded parameter lists (no CLI parameters). Adjust these lists here.
-    highway_speeds = list(frange(30.0, 140, 10))   # 25.0 .. 129.5 by 0.5
-    ramp_speeds = list(frange(20.0, 110, 10))       # 15.0 .. 99.5 by 0.5
-    mainline_flows = list(range(800, 5000, 100))      # 800 .. 4950 step 50
-    ramp_flows = list(range(200, 2000, 100))          # 200 .. 1975 step 25
-
-    # Use streaming generator to avoid building the full grid in memory
-    total = count_valid_combinations(highway_speeds, ramp_speeds, mainline_flows, ramp_flows)
-    if total == 0:
-        print('No parameter combinations generated (check that highway_speed > ramp_speed for at least one pair).')
-        return
-
-    print(f"Starting multiple simulation runs... total iterations: {total}")
-
-    gen = build_filtered_generator(highway_speeds, ramp_speeds, mainline_flows, ramp_flows)
-    for i, params in enumerate(gen):
-        print(f"\nIteration {i+1}/{total} -- {params}")
-        print("=" * 50)
-
-        # Create folder for this iteration's results
-        results_folder = create_iteration_folder(i + 1)
-
-        # Generate new edges and routes for this parameter set
-        print("Generating new edges...")
-        edges_file = generate_new_edges(params['highway_speed'], params['ramp_speed'])
-
-        print("Generating new routes...")
-        routes_file = generate_new_routes(params['mainline_flow'], params['rampline_flow'])
-        if not routes_file:
-            print(f"Failed to generate routes for iteration {i+1}")
-            continue
-
-        # Run SUMO simulation (headless)
-        print("Running SUMO simulation...")
-        sumo_cmd = 'sumo -c "ramp/ramp.sumocfg" ' + \
-                  '--summary-output "Output/summary.xml" ' + \
-                  '--tripinfo-output "Output/tripinfo.xml" ' + \
-                  '--edgedata-output "Output/edgeData.xml"'
-        if not run_command(sumo_cmd):
-            print("SUMO simulation failed")
-            continue
-
-        # Run analysis scripts
-        print("Running analysis...")
-        analysis_scripts = [
-            'Analysis/edgedata_analysis.py',
-            'Analysis/summary_analysis.py',
-            'Analysis/tripinfo_analysis.py',
-            'Analysis/extract_info.py',
-        ]
-
-        for script in analysis_scripts:
-            if not run_command(f'python {script}'):
-                print(f"Analysis script {script} failed")
-
-        # Move results to iteration folder
-        result_files = [
-            'Analysis/analysis_results/edge_density.csv',
-            'Analysis/analysis_results/summary_steps.csv',
-            'Analysis/analysis_results/tripinfo_summary.csv',
-            'Analysis/analysis_results/mean_speed_with_config.csv',
-        ]
-
-        for file in result_files:
-            if os.path.exists(file):
-                new_name = os.path.join(results_folder, os.path.basename(file))
-                shutil.move(file, new_name)
-
-        print(f"Completed iteration {i+1}")
-
-    print("\nAll iterations complete!")
-    print("Results are saved in Analysis/analysis_results/iteration_X folders")
-
-
-if __name__ == "__main__":
-    main()
-import os
-import subprocess
-import shutil
-from datetime import datetime
-from Project_lab.generation.generate_xml import RouteXMLGenerator, EdgeXMLGenerator
-
-
-def run_command(command):
-    """Run a shell command. Return True on success, False on failure.
-
-    Captures stderr for easier debugging on failures.
-    """
-    proc = subprocess.run(command, shell=True, capture_output=True, text=True)
-    if proc.returncode != 0:
-        print(f"Warning: Command '{command}' failed with error:\n{proc.stderr}")
-        return False
-    return True
-
-
-def generate_new_routes(mainline_flow, rampline_flow, routes_file="ramp/ramp.rou.xml"):
-    """Generate routes using RouteXMLGenerator with explicit flow rates."""
-    generator = RouteXMLGenerator(
-        mainline_vehs_per_hour=int(mainline_flow),
-        rampline_vehs_per_hour=int(rampline_flow),
-        output_file=routes_file,
-    )
-    generator.generate_xml()
-    return routes_file
-
-
-def generate_new_edges(highway_speed, ramp_speed, edges_file="ramp/ramp.edg.xml"):
-    """Generate edges using EdgeXMLGenerator with explicit speeds."""
-    edge_generator = EdgeXMLGenerator(
-        highway_speed=float(highway_speed),
-        ramp_speed=float(ramp_speed),
-        output_file=edges_file,
-    )
-    edge_generator.generate_xml()
-    return edges_file
-
-
-def parse_list_or_range(s: str):
-    """Parse a comma-separated list or a start:stop:step range into floats."""
-    s = str(s)
-    if ':' in s:
-        parts = s.split(':')
-        if len(parts) != 3:
-            raise ValueError('Range form must be start:stop:step')
-        start, stop, step = map(float, parts)
-        values = []
-        v = start
-        if step == 0:
-            raise ValueError('step must be non-zero')
-        if step > 0:
-            while v <= stop:
-                values.append(round(v, 6))
-                v += step
-        else:
-            while v >= stop:
-                values.append(round(v, 6))
-                v += step
-        return values
-    else:
-        parts = [p.strip() for p in s.split(',') if p.strip()]
-        return [float(p) for p in parts]
-
-
-def count_valid_combinations(highway_speeds, ramp_speeds, mainline_flows, ramp_flows):
-    """Count combinations where highway_speed > ramp_speed without building the full grid."""
-    c = 0
-    for hs in highway_speeds:
-        for rs in ramp_speeds:
-            if float(hs) <= float(rs):
-                continue
-            for mf in mainline_flows:
-                for rf in ramp_flows:
-                    c += 1
-    return c
-
-
-def build_filtered_generator(highway_speeds, ramp_speeds, mainline_flows, ramp_flows):
-    """Yield parameter dicts where highway_speed > ramp_speed (streaming, memory-light)."""
-    for hs in highway_speeds:
-        for rs in ramp_speeds:
-            if float(hs) <= float(rs):
-                continue
-            for mf in mainline_flows:
-                for rf in ramp_flows:
-                    yield {
-                        'highway_speed': float(hs),
-                        'ramp_speed': float(rs),
-                        'mainline_flow': int(mf),
-                        'rampline_flow': int(rf),
-                    }
-
-
-def frange(start, stop, step):
-    """Float range generator (inclusive when step fits exactly)."""
-    x = float(start)
-    if step == 0:
-        raise ValueError('step must be non-zero')
-    if step > 0:
-        while x <= stop:
-            yield round(x, 6)
-            x += step
-    else:
-        while x >= stop:
-            yield round(x, 6)
-            x += step
-
-
-def create_iteration_folder(iteration):
-    """Create a folder for this iteration's results"""
-    folder = f"Analysis/analysis_results/iteration_{iteration}"
-    os.makedirs(folder, exist_ok=True)
-    return folder
-
-
-def main():
-    # Hard-coded parameter lists (no CLI parameters). Adjust these lists here.
-    highway_speeds = list(frange(25.0, 129.5, 0.5))   # 25.0 .. 129.5 by 0.5
-    ramp_speeds = list(frange(15.0, 99.5, 0.5))       # 15.0 .. 99.5 by 0.5
-    mainline_flows = list(range(800, 5000, 50))      # 800 .. 4950 step 50
-    ramp_flows = list(range(200, 2000, 25))          # 200 .. 1975 step 25
-
-    # Use streaming generator to avoid building the full grid in memory
-    total = count_valid_combinations(highway_speeds, ramp_speeds, mainline_flows, ramp_flows)
-    if total == 0:
-        print('No parameter combinations generated (check that highway_speed > ramp_speed for at least one pair).')
-        return
-
-    print(f"Starting multiple simulation runs... total iterations: {total}")
-
-    gen = build_filtered_generator(highway_speeds, ramp_speeds, mainline_flows, ramp_flows)
-    for i, params in enumerate(gen):
-        print(f"\nIteration {i+1}/{total} -- {params}")
-        print("=" * 50)
-
-        # Create folder for this iteration's results
-        results_folder = create_iteration_folder(i + 1)
-
-        # Generate new edges and routes for this parameter set
-        print("Generating new edges...")
-        edges_file = generate_new_edges(params['highway_speed'], params['ramp_speed'])
-
-        print("Generating new routes...")
-        routes_file = generate_new_routes(params['mainline_flow'], params['rampline_flow'])
-        if not routes_file:
-            print(f"Failed to generate routes for iteration {i+1}")
-            continue
-
-        # Run SUMO simulation (headless)
-        print("Running SUMO simulation...")
-        sumo_cmd = 'sumo -c "ramp/ramp.sumocfg" ' + \
-                  '--summary-output "Output/summary.xml" ' + \
-                  '--tripinfo-output "Output/tripinfo.xml" ' + \
-                  '--edgedata-output "Output/edgeData.xml"'
-        if not run_command(sumo_cmd):
-            print("SUMO simulation failed")
-            continue
-
-        # Run analysis scripts
-        print("Running analysis...")
-        analysis_scripts = [
-            'Analysis/edgedata_analysis.py',
-            'Analysis/summary_analysis.py',
-            'Analysis/tripinfo_analysis.py',
-            'Analysis/extract_info.py',
-        ]
-
-        for script in analysis_scripts:
-            if not run_command(f'python {script}'):
-                print(f"Analysis script {script} failed")
-
-        # Move results to iteration folder
-        result_files = [
-            'Analysis/analysis_results/edge_density.csv',
-            'Analysis/analysis_results/summary_steps.csv',
-            'Analysis/analysis_results/tripinfo_summary.csv',
-            'Analysis/analysis_results/mean_speed_with_config.csv',
-        ]
-
-        for file in result_files:
-            if os.path.exists(file):
-                new_name = os.path.join(results_folder, os.path.basename(file))
-                shutil.move(file, new_name)
-
-        print(f"Completed iteration {i+1}")
-
-    print("\nAll iterations complete!")
-    print("Results are saved in Analysis/analysis_results/iteration_X folders")
-
-
-if __name__ == "__main__":
-    main()
-import os
-import subprocess
-import shutil
-from datetime import datetime
-from Project_lab.generation.generate_xml import RouteXMLGenerator, EdgeXMLGenerator
+from itertools import islice
+from generation.generate_xml import RouteXMLGenerator, EdgeXMLGenerator, DetectorXMLGenerator
+from generation.sampling import ParameterSampler
+from Analysis.xml_io import COMPRESSED_SUFFIXES, compress_file
+from sweep_scheduler import RuntimeModel, TelemetryLog, WorkStealingScheduler, expected_vehicles
+from ctm_simulator import CellTransmissionModel, write_rows
 import numpy as np
 
-
-def run_command(command):
-    """Run a shell command and return True if it succeeds."""
-    process = subprocess.run(command, shell=True, capture_output=True, text=True)
+# SUMO outputs enabled by each output profile. "detectors" are the E1/E2
+# detectors at the merge on main_1a (see generate_detectors), whose aggregated
+# outputs are tiny, so every profile keeps them.
+OUTPUT_PROFILES = {
+    "minimal": ("summary", "detectors"),
+    "standard": ("summary", "tripinfo", "detectors"),
+    "full": ("summary", "tripinfo", "edgedata", "detectors"),
+    # FCD is gigabytes per run; fcd_analysis.py reduces it to one merge-zone record
+    "merge": ("summary", "detectors", "fcd"),
+}
+
+# Output file names, and the SUMO option for those that are set on the command line
+OUTPUT_FILES = {
+    "summary": "summary.xml",
+    "tripinfo": "tripinfo.xml",
+    "edgedata": "edgeData.xml",
+    "e1": "detectors_e1.xml",
+    "e2": "detectors_e2.xml",
+    "fcd": "fcd.xml",
+}
+SUMO_OUTPUT_OPTIONS = {
+    "summary": "--summary-output",
+    "tripinfo": "--tripinfo-output",
+    "edgedata": "--edgedata-output",
+    "fcd": "--fcd-output",
+}
+
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Files a worker directory needs besides the generated edges/routes/detectors
+WORKDIR_FILES = ["ramp/ramp.net.xml", "ramp/ramp.sumocfg", "ramp/input_additional.add.xml"]
+
+# extract_info.py rewrites the shared NN/sim_summary_min.csv, one worker at a time
+DATASET_LOCK = threading.Lock()
+
+
+def run_command(command, cwd=None):
+    """Run a shell command (optionally in cwd) and return True if it succeeds."""
+    process = subprocess.run(command, shell=True, capture_output=True, text=True, cwd=cwd)
     if process.returncode != 0:
         print(f"⚠️ Warning: Command failed:\n{command}\nError:\n{process.stderr}")
     return process.returncode == 0
@@ -455,6 +109,72 @@ def build_filtered_generator(highway_speeds, ramp_speeds, mainline_flows, ramp_f
                     }
 
 
+def sumo_output_paths(profile="full", compression=None, output_dir="Output"):
+    """Return the output paths SUMO should write for an output profile.
+
+    With "gzip" the paths end in .gz so SUMO compresses natively while writing.
+    zstd is not supported by SUMO, so those outputs are written plain and
+    compressed by compress_raw_outputs() right after the run.
+    """
+    if profile not in OUTPUT_PROFILES:
+        raise ValueError(f"Unknown output profile '{profile}', choose from {list(OUTPUT_PROFILES)}")
+    suffix = ".gz" if compression == "gzip" else ""
+    keys = []
+    for output in OUTPUT_PROFILES[profile]:
+        keys += ["e1", "e2"] if output == "detectors" else [output]
+    return {key: os.path.join(output_dir, OUTPUT_FILES[key] + suffix) for key in keys}
+
+
+def generate_detectors(output_paths, detectors_file="ramp/detectors.add.xml"):
+    """Generate the E1/E2 detector additional file writing to the given outputs."""
+    detector_generator = DetectorXMLGenerator(
+        e1_output=output_paths["e1"],
+        e2_output=output_paths["e2"],
+        output_file=detectors_file
+    )
+    detector_generator.generate_xml()
+    return detectors_file
+
+
+def build_sumo_command(output_paths, additional_files=(), config="ramp/ramp.sumocfg"):
+    """Build the headless SUMO command line for the enabled outputs."""
+    command = f'sumo -c "{config}"'
+    for key, option in SUMO_OUTPUT_OPTIONS.items():
+        if key in output_paths:
+            command += f' {option} "{output_paths[key]}"'
+    if additional_files:
+        # Replaces the config's additional-files, so the caller lists them all
+        command += f' --additional-files "{",".join(additional_files)}"'
+    return command
+
+
+def remove_stale_outputs(output_paths):
+    """Delete every plain/compressed variant of the outputs left by a previous run."""
+    for path in output_paths.values():
+        base = path[:-3] if path.endswith(".gz") else path
+        for variant in [base] + [base + s for s in COMPRESSED_SUFFIXES]:
+            if os.path.exists(variant):
+                os.remove(variant)
+
+
+def compress_raw_outputs(output_paths, compression):
+    """Compress plain SUMO outputs in place (zstd) and return the final paths."""
+    if compression != "zstd":
+        return output_paths
+    return {key: compress_file(path, method="zstd") for key, path in output_paths.items()
+            if os.path.exists(path)}
+
+
+def prepare_workdir(worker, root="Output/workers"):
+    """Create a private copy of the scenario for one parallel worker and return its path."""
+    workdir = os.path.join(root, f"worker_{worker}")
+    for folder in ("ramp", "Output", "Analysis/analysis_results"):
+        os.makedirs(os.path.join(workdir, folder), exist_ok=True)
+    for file in WORKDIR_FILES:
+        shutil.copy2(file, os.path.join(workdir, file))
+    return workdir
+
+
 def create_iteration_folder(iteration):
     """Create a folder for this iteration's results."""
     folder = f"Analysis/analysis_results/iteration_{iteration:04d}"
@@ -462,66 +182,248 @@ def create_iteration_folder(iteration):
     return folder
 
 
-def main():
+def prepare_detectors(workdir, settings):
+    """Generate the merge detectors in workdir if the output profile uses them."""
+    if "detectors" not in OUTPUT_PROFILES[settings["output_profile"]]:
+        return
+    output_paths = sumo_output_paths(settings["output_profile"], settings["raw_compression"],
+                                     output_dir=os.path.join(workdir, "Output"))
+    generate_detectors(output_paths, detectors_file=os.path.join(workdir, "ramp/detectors.add.xml"))
+
+
+def run_iteration(i, params, workdir, settings, total_combos):
+    """Generate, simulate and analyse one parameter set in workdir; return True on success."""
+    tag = "" if workdir == "." else f"[{os.path.basename(workdir)}] "
+    print(f"\n▶ {tag}Iteration {i}/{total_combos} | {params}")
+    print("=" * 60)
+
+    iteration_folder = create_iteration_folder(i)
+    outputs = OUTPUT_PROFILES[settings["output_profile"]]
+    results_dir = os.path.join(workdir, "Analysis/analysis_results")
+
+    # Generate XML files
+    print(f"🛠️ {tag}Generating edges and routes...")
+    edges_file = generate_new_edges(params["highway_speed"], params["ramp_speed"],
+                                    edges_file=os.path.join(workdir, "ramp/ramp.edg.xml"))
+    routes_file = generate_new_routes(params["mainline_flow"], params["rampline_flow"],
+                                      routes_file=os.path.join(workdir, "ramp/ramp.rou.xml"))
+
+    # Run SUMO simulation
+    print(f"🚦 {tag}Running SUMO simulation...")
+    output_paths = sumo_output_paths(settings["output_profile"], settings["raw_compression"])
+    remove_stale_outputs({k: os.path.join(workdir, p) for k, p in output_paths.items()})
+    additional_files = ["ramp/input_additional.add.xml"]
+    if "detectors" in outputs:
+        additional_files.append("ramp/detectors.add.xml")
+    sumo_cmd = build_sumo_command(output_paths, additional_files)
+    if not run_command(sumo_cmd, cwd=workdir):
+        print(f"❌ {tag}SUMO simulation failed; skipping this iteration.")
+        return False
+    output_paths = compress_raw_outputs({k: os.path.join(workdir, p) for k, p in output_paths.items()},
+                                        settings["raw_compression"])
+
+    # Run analysis scripts
+    print(f"📊 {tag}Running analysis scripts...")
+    analysis = os.path.join(PROJECT_DIR, "Analysis")
+    analysis_commands = []
+    if "edgedata" in outputs:
+        analysis_commands.append(f'python "{analysis}/edgedata_analysis.py"')
+    analysis_commands.append(f'python "{analysis}/summary_analysis.py" '
+                             f'--window {settings["summary_window"]} --agg "{settings["summary_aggs"]}"')
+    if "tripinfo" in outputs:
+        analysis_commands.append(f'python "{analysis}/tripinfo_analysis.py"')
+    if "detectors" in outputs:
+        analysis_commands.append(f'python "{analysis}/detector_analysis.py"')
+    if "fcd" in outputs:
+        analysis_commands.append(f'python "{analysis}/fcd_analysis.py"')
+    for command in analysis_commands:
+        if not run_command(command, cwd=workdir):
+            print(f"⚠️ {tag}Analysis command {command} failed, continuing...")
+
+    extract_cmd = (f'python "{analysis}/extract_info.py" --edg "{os.path.abspath(edges_file)}" '
+                   f'--rou "{os.path.abspath(routes_file)}" --summary "{os.path.abspath(output_paths["summary"])}" '
+                   f'--sim-id {os.path.basename(iteration_folder)} --results "{os.path.abspath(results_dir)}"')
+    with DATASET_LOCK:
+        if not run_command(extract_cmd):
+            print(f"⚠️ {tag}Analysis command {extract_cmd} failed, continuing...")
+
+    # Move results
+    print(f"📁 {tag}Moving analysis results...")
+    result_files = [
+        "edge_density.csv",
+        "summary_steps.csv",
+        "tripinfo_summary.csv",
+        "detectors.csv",
+        "merge_metrics.csv",
+        "mean_speed_with_config.csv"
+    ]
+    for file in result_files:
+        file = os.path.join(results_dir, file)
+        if os.path.exists(file):
+            shutil.move(file, os.path.join(iteration_folder, os.path.basename(file)))
+    if settings["keep_raw_outputs"]:
+        for file in output_paths.values():
+            if os.path.exists(file):
+                shutil.move(file, os.path.join(iteration_folder, os.path.basename(file)))
+    elif "fcd" in output_paths and os.path.exists(output_paths["fcd"]):
+        # Only the reduced merge_metrics.csv is kept from the (huge) FCD output
+        os.remove(output_paths["fcd"])
+    # Written last, so only completed runs can be mapped back to their parameters
+    # by Analysis/backfill_dataset.py
+    with open(os.path.join(iteration_folder, "params.json"), "w", encoding="utf-8") as f:
+        json.dump(params, f, default=float)
+
+    print(f"✅ {tag}Completed iteration {i}/{total_combos}")
+    return True
+
+
+def main(max_iterations=None):
+    """Run the sweep; max_iterations caps the number of runs (None runs them all)."""
     # === Parameter Space ===
     highway_speeds = np.arange(25.0, 130.0, 5.0).tolist()
     ramp_speeds = np.arange(15.0, 100.0, 5.0).tolist()
     mainline_flows = np.arange(800, 5000, 400).tolist()
     ramp_flows = np.arange(200, 2000, 200).tolist()
 
-    # Count total valid combinations
-    total_combos = count_valid_combinations(highway_speeds, ramp_speeds, mainline_flows, ramp_flows)
-    print(f"🚀 Starting parameter sweep: {total_combos} total valid combinations\n")
-
-    # === Main Simulation Loop ===
-    for i, params in enumerate(build_filtered_generator(highway_speeds, ramp_speeds, mainline_flows, ramp_flows), start=1):
-        print(f"\n▶ Iteration {i}/{total_combos} | {params}")
-        print("=" * 60)
-
-        iteration_folder = create_iteration_folder(i)
-
-        # Generate XML files
-        print("🛠️ Generating edges and routes...")
-        generate_new_edges(params["highway_speed"], params["ramp_speed"])
-        generate_new_routes(params["mainline_flow"], params["rampline_flow"])
-
-        # Run SUMO simulation
-        print("🚦 Running SUMO simulation...")
-        sumo_cmd = (
-            'sumo -c "ramp/ramp.sumocfg" '
-            '--summary-output "Output/summary.xml" '
-            '--tripinfo-output "Output/tripinfo.xml" '
-            '--edgedata-output "Output/edgeData.xml"'
+    # === Experiment Design ===
+    # None runs the full grid above; "lhs", "sobol" or "halton" instead draws
+    # n_samples space-filling points within the same bounds. To extend a design,
+    # keep the seed and set sampling_start to the number of points already
+    # simulated: they are skipped and numbering continues after them.
+    sampling_method = None
+    n_samples = 4096
+    sampling_seed = 42
+    sampling_start = 0
+
+    # === Raw Output Archiving ===
+    # keep_raw_outputs moves SUMO's XML into each iteration folder for debugging;
+    # raw_compression ("gzip", "zstd" or None) compresses the archived files.
+    # It only applies when keep_raw_outputs is set; the analysis scripts read
+    # the compressed files directly.
+    keep_raw_outputs = False
+    raw_compression = None
+
+    # === Summary Downsampling ===
+    # summary_steps.csv keeps one row per summary_window seconds (0 keeps every
+    # 0.2 s step) with the given aggregations ("mean", "min", "max", "last").
+    # "mean" is required: the dataset's meanSpeed_avg is derived from it.
+    summary_window = 10.0
+    summary_aggs = "mean"
+
+    # === Output Profile ===
+    # "minimal" (summary + merge detectors), "standard" (+ tripinfo), "full"
+    # (+ edgeData) or "merge" (minimal + FCD reduced to merge-zone metrics).
+    # Cheaper profiles skip the analysis of disabled outputs.
+    output_profile = "full"
+
+    # === Parallel Workers ===
+    # With n_workers > 1 each worker runs in its own copy of the scenario under
+    # Output/workers. Jobs are scheduled longest-predicted-first (runtime fitted
+    # on past telemetry, else the expected vehicle count) in batches of
+    # schedule_batch_size, and idle workers steal queued jobs.
+    n_workers = 1
+    schedule_batch_size = 20000
+    telemetry_path = "Analysis/analysis_results/runtime_telemetry.csv"
+
+    # === Simulation Engine ===
+    # "sumo" simulates every parameter set; "ctm" pre-screens the sweep with the
+    # vectorized cell transmission model in ctm_simulator.py, ctm_batch_size sets
+    # at a time, and appends the rows to ctm_dataset_path instead.
+    engine = "sumo"
+    ctm_batch_size = 4096
+    ctm_calibration_path = "NN/ctm_calibration.json"
+    ctm_dataset_path = "NN/sim_summary_ctm.csv"
+
+    if "mean" not in [agg.strip() for agg in summary_aggs.split(",")]:
+        raise ValueError(f"summary_aggs must include 'mean' (meanSpeed_avg is derived from it), got '{summary_aggs}'")
+
+    if sampling_method:
+        sampler = ParameterSampler(
+            method=sampling_method,
+            seed=sampling_seed,
+            highway_speed=(min(highway_speeds), max(highway_speeds)),
+            ramp_speed=(min(ramp_speeds), max(ramp_speeds)),
+            mainline_flow=(min(mainline_flows), max(mainline_flows)),
+            rampline_flow=(min(ramp_flows), max(ramp_flows)),
         )
-        if not run_command(sumo_cmd):
-            print("❌ SUMO simulation failed; skipping this iteration.")
-            continue
-
-        # Run analysis scripts
-        print("📊 Running analysis scripts...")
-        analysis_scripts = [
-            "Analysis/edgedata_analysis.py",
-            "Analysis/summary_analysis.py",
-            "Analysis/tripinfo_analysis.py",
-            "Analysis/extract_info.py"
-        ]
-        for script in analysis_scripts:
-            if not run_command(f'python "{script}"'):
-                print(f"⚠️ Analysis script {script} failed, continuing...")
-
-        # Move results
-        print("📁 Moving analysis results...")
-        result_files = [
-            "Analysis/analysis_results/edge_density.csv",
-            "Analysis/analysis_results/summary_steps.csv",
-            "Analysis/analysis_results/tripinfo_summary.csv",
-            "Analysis/analysis_results/mean_speed_with_config.csv"
-        ]
-        for file in result_files:
-            if os.path.exists(file):
-                shutil.move(file, os.path.join(iteration_folder, os.path.basename(file)))
+        sampler.skip(sampling_start)
+        first_iteration = sampling_start + 1
+        total_combos = n_samples
+        param_generator = sampler.generate(n_samples)
+        print(f"🚀 Starting parameter sweep: {total_combos} {sampling_method} samples (seed {sampling_seed}, "
+              f"from point {first_iteration})\n")
+    else:
+        # Count total valid combinations
+        total_combos = count_valid_combinations(highway_speeds, ramp_speeds, mainline_flows, ramp_flows)
+        param_generator = build_filtered_generator(highway_speeds, ramp_speeds, mainline_flows, ramp_flows)
+        first_iteration = 1
+        print(f"🚀 Starting parameter sweep: {total_combos} total valid combinations\n")
+
+    if max_iterations is not None:
+        total_combos = min(total_combos, max_iterations)
+
+    settings = {
+        "output_profile": output_profile,
+        # Outputs that are not archived are overwritten by the next run, so compressing them is wasted work
+        "raw_compression": raw_compression if keep_raw_outputs else None,
+        "keep_raw_outputs": keep_raw_outputs,
+        "summary_window": summary_window,
+        "summary_aggs": summary_aggs,
+    }
+    jobs = islice(enumerate(param_generator, start=first_iteration), total_combos)
+    last_iteration = first_iteration + total_combos - 1
+
+    if engine == "ctm":
+        ctm = CellTransmissionModel.load(ctm_calibration_path)
+        while True:
+            batch = list(islice(jobs, ctm_batch_size))
+            if not batch:
+                break
+            points = np.array([[params["highway_speed"], params["ramp_speed"], params["mainline_flow"],
+                                params["rampline_flow"]] for _i, params in batch], dtype=float)
+            t0 = time.perf_counter()
+            write_rows(ctm_dataset_path, batch[0][0], points, ctm.predict(points))
+            print(f"⚡ CTM: iterations {batch[0][0]}-{batch[-1][0]}/{last_iteration} "
+                  f"in {time.perf_counter() - t0:.1f} s")
+        print(f"\n🎉 All iterations complete! Results saved in:\n   → {ctm_dataset_path}")
+        return
 
-        print(f"✅ Completed iteration {i}/{total_combos}")
+    # A single worker runs directly in the project folder, several get private copies
+    workdirs = ["."] if n_workers <= 1 else [prepare_workdir(w) for w in range(n_workers)]
+    for workdir in workdirs:
+        prepare_detectors(workdir, settings)
+    model = RuntimeModel.from_telemetry(telemetry_path)
+    telemetry = TelemetryLog(telemetry_path)
+
+    def execute(i, params, worker, predicted=None):
+        t0 = time.perf_counter()
+        ok = run_iteration(i, params, workdirs[worker], settings, last_iteration)
+        if ok:
+            if not model.fitted:
+                predicted = ""  # the fallback is a vehicle count, not seconds
+            elif predicted is None:
+                predicted = model.predict(params)
+            telemetry.append({
+                "iteration": i, **params, "vehicles": expected_vehicles(params),
+                "predicted_seconds": predicted,
+                "seconds": time.perf_counter() - t0, "worker": worker,
+            })
+        return ok
+
+    if n_workers <= 1:
+        # Sequential: run in enumeration order, still recording telemetry
+        for i, params in jobs:
+            execute(i, params, 0)
+    else:
+        # Parallel: longest predicted jobs first, idle workers steal queued jobs
+        while True:
+            batch = list(islice(jobs, schedule_batch_size))
+            if not batch:
+                break
+            scheduler = WorkStealingScheduler(n_workers, model.predict)
+            scheduler.run(batch, execute)
+            print(f"⏱️ Batch of {len(batch)} jobs finished in {scheduler.makespan:.1f} s on {n_workers} workers")
+            model = RuntimeModel.from_telemetry(telemetry_path)
 
     print("\n🎉 All iterations complete! Results saved in:")
     print("   → Analysis/analysis_results/iteration_XXXX folders")
@@ -0,0 +1,169 @@
+import collections
+import csv
+import heapq
+import os
+import threading
+import time
+import traceback
+
+import numpy as np
+
+TELEMETRY_FIELDS = [
+    "iteration", "highway_speed", "ramp_speed", "mainline_flow", "rampline_flow",
+    "vehicles", "predicted_seconds", "seconds", "worker",
+]
+
+
+def expected_vehicles(params, flow_seconds=600.0):
+    """Vehicles inserted by the mainline and ramp flows (they run for 600 s in the route file)."""
+    return (float(params["mainline_flow"]) + float(params["rampline_flow"])) * flow_seconds / 3600.0
+
+
+class RuntimeModel:
+    """
+    Predicts the runtime of a sweep job from its expected vehicle count.
+
+    With enough past telemetry it fits seconds = a + b*v + c*v^2 (congestion makes
+    runtime grow faster than linearly with the vehicles v); otherwise it falls back
+    to the vehicle count itself, which still orders the jobs correctly.
+    """
+
+    def __init__(self, coefficients=None):
+        self.coefficients = coefficients
+
+    @classmethod
+    def from_telemetry(cls, telemetry_path, min_rows=10):
+        """Fit the model on a telemetry CSV written by TelemetryLog (if it has enough rows)."""
+        if not os.path.exists(telemetry_path):
+            return cls()
+        vehicles, seconds = [], []
+        with open(telemetry_path, "r", newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                try:
+                    vehicles.append(float(row["vehicles"]))
+                    seconds.append(float(row["seconds"]))
+                except (KeyError, ValueError):
+                    continue
+        if len(vehicles) < min_rows:
+            return cls()
+        v = np.asarray(vehicles)
+        design = np.column_stack([np.ones_like(v), v, v ** 2])
+        coefficients, *_ = np.linalg.lstsq(design, np.asarray(seconds), rcond=None)
+        return cls(coefficients.tolist())
+
+    @property
+    def fitted(self):
+        """True once predict() returns seconds rather than the vehicle-count fallback."""
+        return self.coefficients is not None
+
+    def predict(self, params):
+        v = expected_vehicles(params)
+        if self.coefficients is None:
+            return v
+        a, b, c = self.coefficients
+        return max(a + b * v + c * v * v, 0.0)
+
+
+class TelemetryLog:
+    """Thread-safe CSV log of the runtime of every finished sweep job."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, row):
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            new_file = not os.path.exists(self.path)
+            with open(self.path, "a", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=TELEMETRY_FIELDS)
+                if new_file:
+                    writer.writeheader()
+                writer.writerow({k: row.get(k, "") for k in TELEMETRY_FIELDS})
+
+
+class WorkStealingScheduler:
+    """
+    Runs jobs on parallel worker threads, longest predicted job first.
+
+    Jobs are dealt to per-worker deques with the LPT rule (each job, longest
+    first, goes to the worker with the least predicted load). A worker takes
+    jobs from the front of its own deque; once it is empty it steals from the
+    back of the deque with the most predicted work left, so no worker idles
+    while another still has a queue.
+    """
+
+    def __init__(self, n_workers, predict):
+        """
+        Initialize the scheduler.
+
+        Args:
+            n_workers (int): Number of worker threads.
+            predict (callable): Maps a job's params dict to its predicted runtime.
+        """
+        if n_workers < 1:
+            raise ValueError("n_workers must be at least 1")
+        self.n_workers = n_workers
+        self.predict = predict
+        self._lock = threading.Lock()
+        self._queues = []
+        self._loads = []
+        self.makespan = None
+
+    def _deal(self, jobs):
+        """Distribute (iteration, params) jobs over the worker deques (LPT)."""
+        predicted = sorted(((self.predict(params), i, params) for i, params in jobs),
+                           key=lambda job: job[0], reverse=True)
+        self._queues = [collections.deque() for _ in range(self.n_workers)]
+        self._loads = [0.0] * self.n_workers
+        heap = [(0.0, w) for w in range(self.n_workers)]
+        for job in predicted:
+            load, w = heapq.heappop(heap)
+            self._queues[w].append(job)
+            self._loads[w] = load + job[0]
+            heapq.heappush(heap, (self._loads[w], w))
+
+    def _next_job(self, worker):
+        """Pop the worker's own next job, or steal one; None when all queues are empty."""
+        with self._lock:
+            if self._queues[worker]:
+                job = self._queues[worker].popleft()
+                self._loads[worker] -= job[0]
+                return job
+            victim = max(range(self.n_workers), key=lambda w: self._loads[w] if self._queues[w] else -1.0)
+            if not self._queues[victim]:
+                return None
+            job = self._queues[victim].pop()
+            self._loads[victim] -= job[0]
+            return job
+
+    def run(self, jobs, execute):
+        """
+        Execute every (iteration, params) job and return {iteration: result}.
+
+        execute(iteration, params, worker, predicted_seconds) is called on the
+        worker threads; it must guard any state shared between workers itself.
+        """
+        self._deal(jobs)
+        results = {}
+
+        def work(worker):
+            while True:
+                job = self._next_job(worker)
+                if job is None:
+                    return
+                predicted, iteration, params = job
+                try:
+                    results[iteration] = execute(iteration, params, worker, predicted)
+                except Exception:
+                    print(f"❌ Worker {worker} failed on iteration {iteration}:\n{traceback.format_exc()}")
+                    results[iteration] = None
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=work, args=(w,), daemon=True) for w in range(self.n_workers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.makespan = time.perf_counter() - start
+        return results